@@ -2,7 +2,6 @@
 The nonogrampy module.
 """
 
-import copy
 import functools
 import logging
 
@@ -28,23 +27,27 @@ def log_changes(rule):
         @functools.wraps(func)
         def wrapped_f(mask, meta):
             """The new (wrapped) func"""
-            if _LOGGER.isEnabledFor(logging.DEBUG):
-                orig_mask = copy.deepcopy(mask)
-                orig_meta = copy.deepcopy(meta)
+            if not _LOGGER.isEnabledFor(logging.DEBUG):
+                func(mask, meta)
+                return
+
+            # snapshots instead of deep copies: only the cells and the block
+            # ranges can change
+            orig_mask = bytes(mask)
+            orig_ranges = meta.ranges()
 
             func(mask, meta)
 
-            if _LOGGER.isEnabledFor(logging.DEBUG):
-                if mask != orig_mask:
-                    _LOGGER.debug(
-                        "%s %s: %s -> %s %s", rule, func.__name__, orig_mask, mask, meta
-                    )
+            if mask != orig_mask:
+                _LOGGER.debug(
+                    "%s %s: %s -> %s %s", rule, func.__name__, orig_mask, mask, meta
+                )
 
-                if meta != orig_meta:
-                    _LOGGER.debug(
-                        "%s %s: %s -> %s", rule, func.__name__, orig_meta, meta
-                    )
+            if meta.ranges() != orig_ranges:
+                _LOGGER.debug("%s %s: %s -> %s", rule, func.__name__, orig_ranges, meta)
 
+        # the name of the rule in the paper
+        wrapped_f.rule = rule
         return wrapped_f
 
     return wrap
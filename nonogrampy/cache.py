@@ -0,0 +1,57 @@
+"""
+Bounded cache of the results of solving a line.
+"""
+
+import collections
+
+
+class LineCache:
+    """
+    Least recently used cache mapping a (clue, mask) pair to the result of
+    solving the line: the new mask and block ranges or the message of the
+    discrepancy that has been detected.
+    """
+
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries = collections.OrderedDict()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __str__(self):
+        return "size: {}/{}, hits: {}, misses: {}".format(
+            len(self), self.maxsize, self.hits, self.misses
+        )
+
+    def get(self, key):
+        """Return the entry stored for the key (and mark it as recently used)
+        or None if there's no such entry."""
+        try:
+            entry = self._entries[key]
+        except KeyError:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        self._entries.move_to_end(key)
+        return entry
+
+    def put(self, key, entry):
+        """Store the entry and evict the least recently used one if the cache
+        is full."""
+        if self.maxsize <= 0:
+            return
+
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        """Drop all the entries and reset the counters."""
+        self._entries.clear()
+        self.hits = 0
+        self.misses = 0
@@ -0,0 +1,101 @@
+"""
+Statistics of the rules applied during the solving process.
+"""
+
+import contextlib
+import dataclasses
+import json
+import time
+
+from nonogrampy import DiscrepancyInModel
+from nonogrampy.raster import UNKNOWN
+
+
+@dataclasses.dataclass
+class RuleStats:
+    """
+    Class incorporating the statistics of a rule.
+    """
+
+    # pylint: disable=too-few-public-methods
+    calls: int = 0
+    seconds: float = 0.0
+    cells: int = 0  # number of cells colored
+    ranges: int = 0  # number of cells the block ranges narrowed by
+    discrepancies: int = 0
+
+
+def rule_name(func):
+    """Return the name of the rule implemented by the function."""
+    rule = getattr(func, "rule", None)
+    if rule is None:
+        return func.__name__
+
+    return "{} {}".format(rule, func.__name__)
+
+
+def _range_units(meta):
+    """Return the sum of the size of the block ranges."""
+    return sum(block.end - block.start + 1 for block in meta.blocks)
+
+
+class RuleProfile:
+    """
+    Collects the number of calls, the time spent, the number of cells colored,
+    the narrowing of the block ranges and the discrepancies raised per rule.
+    """
+
+    def __init__(self):
+        self.stats = {}
+
+    @contextlib.contextmanager
+    def measure(self, func, mask, meta):
+        """Context manager recording the effect of applying the rule on the
+        mask and the meta data within its block."""
+        stats = self.stats.setdefault(rule_name(func), RuleStats())
+        unknowns = mask.count(UNKNOWN)
+        units = _range_units(meta)
+        start = time.perf_counter()
+        try:
+            yield
+        except DiscrepancyInModel:
+            stats.discrepancies += 1
+            raise
+        finally:
+            stats.seconds += time.perf_counter() - start
+            stats.calls += 1
+            stats.cells += unknowns - mask.count(UNKNOWN)
+            stats.ranges += units - _range_units(meta)
+
+    def sorted_stats(self):
+        """Return the (name, stats) pairs, the most time consuming rule
+        first."""
+        return sorted(self.stats.items(), key=lambda item: -item[1].seconds)
+
+    def __str__(self):
+        width = max([len("rule")] + [len(name) for name in self.stats])
+        fmt = "{:<%d} {:>9} {:>10} {:>9} {:>9} {:>13}" % width
+        lines = [
+            fmt.format("rule", "calls", "time [s]", "cells", "ranges", "discrepancies")
+        ]
+        for name, stats in self.sorted_stats():
+            lines.append(
+                fmt.format(
+                    name,
+                    stats.calls,
+                    "{:.3f}".format(stats.seconds),
+                    stats.cells,
+                    stats.ranges,
+                    stats.discrepancies,
+                )
+            )
+
+        return "\n".join(lines)
+
+    def to_json(self, file_):
+        """Write the statistics to the file in JSON format."""
+        json.dump(
+            {name: dataclasses.asdict(stats) for name, stats in self.sorted_stats()},
+            file_,
+            indent=2,
+        )
@@ -2,7 +2,6 @@
 Module for the nonogram model.
 """
 
-from functools import reduce
 import copy
 import itertools
 import os
@@ -31,22 +30,66 @@ def cleanse_puzzle(lines):
 
 def filled_cnt(mask):
     """Return the number of (already) black and white colored cells in the mask."""
-    cblack, cwhite = 0, 0
-    for i in mask:
-        if i == BLACK:
-            cblack += 1
-        elif i == WHITE:
-            cwhite += 1
+    return (mask.count(BLACK), mask.count(WHITE))
 
-    return (cblack, cwhite)
+
+class _CellCounts:
+    """
+    Number of BLACK and WHITE cells of every column and row (indexed by
+    is_row like the meta data: [0] is for the columns, [1] for the rows) and
+    the number of UNKNOWN cells of the whole table.
+    """
+
+    # pylint: disable=too-few-public-methods
+    __slots__ = ("blacks", "whites", "unknowns")
+
+    def __init__(self, rows):
+        cols = list(zip(*rows))
+        self.blacks = (
+            [col.count(BLACK) for col in cols],
+            [row.count(BLACK) for row in rows],
+        )
+        self.whites = (
+            [col.count(WHITE) for col in cols],
+            [row.count(WHITE) for row in rows],
+        )
+        self.unknowns = sum(row.count(UNKNOWN) for row in rows)
+
+    def copy(self):
+        """Return an independent copy of the counters."""
+        clone = object.__new__(_CellCounts)
+        clone.blacks = (self.blacks[0][:], self.blacks[1][:])
+        clone.whites = (self.whites[0][:], self.whites[1][:])
+        clone.unknowns = self.unknowns
+        return clone
+
+    def recolor(self, row_idx, col_idx, old, new):
+        """Count the cell at the given position colored from old to new."""
+        for color, delta in ((old, -1), (new, 1)):
+            if color == UNKNOWN:
+                self.unknowns += delta
+            else:
+                counts = self.blacks if color == BLACK else self.whites
+                counts[0][col_idx] += delta
+                counts[1][row_idx] += delta
 
 
 class Raster:
     """
     Class representing the nonogram model.
+
+    The number of BLACK, WHITE and UNKNOWN cells of the rows and columns are
+    maintained by update_row, update_col and set_cell. If the table is
+    accessed directly, they are recomputed when they are needed next time.
+
+    A clone (see clone) shares the rows with the raster until either of them
+    modifies them. The meta data of the lines is persistent: a line is
+    replaced by a new version (see set_line and Line.with_ranges) instead of
+    being modified, so the versions are shared by any number of clones.
     """
 
     def __init__(self, table, row_meta, col_meta):
+        self._counts = None
         self.table = table
         self.width = len(table[0])
         self.height = len(table)
@@ -92,6 +135,59 @@ class Raster:
 
         return cls(**dict(table=table, row_meta=row_meta, col_meta=col_meta))
 
+    def __deepcopy__(self, memo):
+        """Cheaper than the generic deepcopy: the cells are copied row by row
+        and only the blocks of the meta data (see Line.__deepcopy__)."""
+        clone = copy.copy(self)
+        clone._copy_cells()
+        if self._counts is not None:
+            clone._counts = self._counts.copy()
+        clone.row_meta = copy.deepcopy(self.row_meta, memo)
+        clone.col_meta = copy.deepcopy(self.col_meta, memo)
+        return clone
+
+    def clone(self):
+        """Return a copy-on-write copy of the raster: the rows are shared with
+        it until they are modified, the meta data of the lines is shared (see
+        set_line)."""
+        clone = copy.copy(self)
+        if self._counts is not None:
+            clone._counts = self._counts.copy()
+        clone.row_meta = list(self.row_meta)
+        clone.col_meta = list(self.col_meta)
+        for raster in (self, clone):
+            raster._share_cells()
+        return clone
+
+    def set_line(self, meta):
+        """Replace the meta data of a row or column (identified by
+        meta.is_row and meta.idx) with a new version."""
+        if meta.is_row:
+            self.row_meta[meta.idx] = meta
+        else:
+            self.col_meta[meta.idx] = meta
+
+    def _copy_cells(self):
+        """Replace the internal table (shared with the original after a
+        shallow copy) with its copy."""
+        self._table = [row[:] for row in self._table]
+        self._own_rows = None
+
+    def _share_cells(self):
+        """Take a copy of the list of the rows, the rows themselves are copied
+        when they are modified next time."""
+        self._table = list(self._table)
+        self._own_rows = bytearray(len(self._table))
+
+    def _writable_row(self, idx):
+        """Return the idx'th row of the internal table, copied first if it's
+        shared with a clone."""
+        if self._own_rows is not None and not self._own_rows[idx]:
+            self._table[idx] = self._table[idx][:]
+            self._own_rows[idx] = 1
+
+        return self._table[idx]
+
     def __str__(self):
         repr_ = ""
         offset = "   "
@@ -108,23 +204,63 @@ class Raster:
 
         for i in range(self.height):
             line_ = " " + str(i % 10) + " "
-            line_ += self.table[i].decode("ascii") + " "
+            line_ += self.get_row(i).decode("ascii") + " "
             line_ += "; ".join((str(block) for block in self.row_meta[i].blocks))
             repr_ += line_ + os.linesep
 
         return repr_ + os.linesep
 
+    @property
+    def table(self):
+        """Return the internal table (list of rows). As the caller may modify
+        it, the cell counters are recomputed when they are needed next time
+        and the rows shared with a clone are copied."""
+        self._counts = None
+        if self._own_rows is not None:
+            for idx in range(len(self._table)):
+                self._writable_row(idx)
+        return self._table
+
+    @table.setter
+    def table(self, table):
+        """Replace the internal table with the list of rows."""
+        self._counts = None
+        self._table = table
+        # the rows owned by the raster if it's been cloned, all of them
+        # otherwise
+        self._own_rows = None
+
+    def _cell_counts(self):
+        """Return the cell counters, recompute them if they are not valid."""
+        if self._counts is None:
+            # self.table invalidates the counters, so read it first
+            rows = self.table
+            self._counts = _CellCounts(rows)
+
+        return self._counts
+
+    def filled_cnt(self, is_row, idx):
+        """Return the number of black and white cells of the idx'th row or
+        column (like filled_cnt but without scanning it)."""
+        counts = self._cell_counts()
+        return (counts.blacks[is_row][idx], counts.whites[is_row][idx])
+
+    def unknown_cnt(self, is_row, idx):
+        """Return the number of UNKNOWN cells of the idx'th row or column."""
+        cblack, cwhite = self.filled_cnt(is_row, idx)
+        return (self.width if is_row else self.height) - cblack - cwhite
+
     def get_row(self, idx):
         """Returns the copy of the idx'th row of the internal table."""
-        return self.table[idx][:]
+        return self._table[idx][:]
 
     def get_col(self, idx):
         """Returns the copy of the idx'th column of the internal table."""
-        return bytearray((x[idx] for x in self.table))
+        return bytearray((x[idx] for x in self._table))
 
     def is_solved(self):
         """If there's no "UNKNOWN" cell, then the puzzle is solved."""
-        return reduce(lambda x, y: x and not UNKNOWN in y, self.table, True)
+        return self._cell_counts().unknowns == 0
 
     def update_row(self, idx=None, mask=None):
         """Updates the UNKNOWN cells of the idx'th row based on the mask."""
@@ -133,18 +269,33 @@ class Raster:
             rec=row, mask=mask, idx=idx, type_="row"
         )
         self._replace_row(row=new, idx=idx)
+        self._count_modified(True, idx, mask, modified_cells)
 
         return modified_cells
 
+    def _count_modified(self, is_row, idx, mask, modified_cells):
+        """Update the cell counters with the cells of the idx'th row or column
+        colored by update_row or update_col."""
+        if self._counts is None:
+            return
+
+        for i in modified_cells:
+            if is_row:
+                self._counts.recolor(idx, i, UNKNOWN, mask[i])
+            else:
+                self._counts.recolor(i, idx, UNKNOWN, mask[i])
+
     def _replace_row(self, row=None, idx=None):
         """Replace the idx'th row of the internal table with the value in the
-        params."""
-        self.table[idx] = row
+        params. Does not update the cell counters."""
+        self._table[idx] = row
+        if self._own_rows is not None:
+            self._own_rows[idx] = 1
 
     def _update_list(self, rec=None, mask=None, idx=None, type_=None):
         """Updates the list based on the mask."""
         modified_cells = []
-        original = copy.deepcopy(rec)
+        original = rec[:]
 
         for i in range(len(rec)):
             if rec[i] == UNKNOWN and mask[i] != UNKNOWN:
@@ -167,26 +318,30 @@ class Raster:
             rec=col, mask=mask, idx=idx, type_="col"
         )
         self._replace_col(col=new, idx=idx)
+        self._count_modified(False, idx, mask, modified_cells)
 
         return modified_cells
 
     def _replace_col(self, col=None, idx=None):
         """Replace the idx'th column of the internal table with the value in
-        the params."""
+        the params. Does not update the cell counters."""
         for cell_idx in range(len(col)):
-            self.table[cell_idx][idx] = col[cell_idx]
+            # the rows shared with a clone are copied only if they change
+            if self._table[cell_idx][idx] != col[cell_idx]:
+                self._writable_row(cell_idx)[idx] = col[cell_idx]
+
+    def set_cell(self, row_idx, col_idx, value):
+        """Set the cell of the internal table at the given position."""
+        if self._counts is not None:
+            self._counts.recolor(row_idx, col_idx, self._table[row_idx][col_idx], value)
+        self._writable_row(row_idx)[col_idx] = value
 
     def _count_unknowns(self):
         """Return how many UNKNOWN fields are in a row."""
         res = []
-        for i, row in enumerate(self.table):
+        for i in range(self.height):
             _, nwhite = self.row_meta[i].nums
-            cnt = 0
-            for byte in row:
-                if UNKNOWN == byte:
-                    cnt += 1
-
-            res.append([cnt, nwhite, i])
+            res.append([self.unknown_cnt(True, i), nwhite, i])
 
         # drop rows not having UNKNOWN fields
         return [r for r in res if r[0] > 0]
@@ -200,22 +355,24 @@ class Raster:
         return sorted(self._count_unknowns(), key=lambda x: x[0] * self.width + x[1])
 
     def make_guess(self, idx):
-        """Return a copy (clone) of self by changing an UNKNOWN field to BLACK
-        and then to WHITE at the selected index of the given row or column.
+        """Return a copy (clone, see clone) of self by changing an UNKNOWN
+        field to BLACK and then to WHITE at the selected index of the given row
+        or column.
         """
         # num of black & white cells according to the cues
         nblack, nwhite = self.row_meta[idx].nums
+        row = self.get_row(idx)
         # num of actually black and white colored cells
-        cblack, cwhite = filled_cnt(self.table[idx])
+        cblack, cwhite = self.filled_cnt(True, idx)
 
-        for i, byte in enumerate(self.table[idx]):
+        for i, byte in enumerate(row):
             if UNKNOWN == byte:
                 if cblack < nblack:
-                    guess = copy.deepcopy(self)
-                    guess.table[idx][i] = BLACK
+                    guess = self.clone()
+                    guess.set_cell(idx, i, BLACK)
                     yield guess
 
                 if cwhite < nwhite:
-                    guess = copy.deepcopy(self)
-                    guess.table[idx][i] = WHITE
+                    guess = self.clone()
+                    guess.set_cell(idx, i, WHITE)
                     yield guess
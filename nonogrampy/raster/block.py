@@ -12,9 +12,13 @@ class Block:
     """
 
     # pylint: disable=too-few-public-methods
+    __slots__ = ("start", "end", "length")
     start: int
     end: int
     length: int
 
+    def __deepcopy__(self, memo):
+        return Block(self.start, self.end, self.length)
+
     def __str__(self):
         return "({!s}<->{!s}|len: {!s})".format(self.start, self.end, self.length)
@@ -5,6 +5,26 @@ Class incorporating the meta information that we know of a row or column.
 import dataclasses
 import typing
 
+from nonogrampy.raster.block import Block
+
+# shapes of the cues of a line
+SHAPE_EMPTY = "empty"  # no black cell at all
+SHAPE_FULL = "full"  # the blocks fill the line with single spaces between them
+SHAPE_SINGLE = "single"  # one block
+SHAPE_GENERAL = "general"
+
+
+def clue_shape(size, lengths):
+    """Return the shape of the cues having the given block lengths."""
+    if not any(lengths):
+        return SHAPE_EMPTY
+    if sum(lengths) + len(lengths) - 1 == size:
+        return SHAPE_FULL
+    if len(lengths) == 1:
+        return SHAPE_SINGLE
+
+    return SHAPE_GENERAL
+
 
 @dataclasses.dataclass
 class Line:
@@ -13,10 +33,12 @@ class Line:
     """
 
     # pylint: disable=too-few-public-methods
+    __slots__ = ("size", "idx", "blocks", "nums", "shape", "automaton")
     size: int
     idx: int
     blocks: typing.List[typing.Any]
     nums: typing.Tuple[int, int]  # number of black & white cells according to the cues
+    shape: str  # see SHAPE_*
 
     def __init__(self, size, idx, blocks):
         self.size = size
@@ -28,6 +50,48 @@ class Line:
             nblack += block.length
 
         self.nums = (nblack, size - nblack)
+        self.shape = clue_shape(size, [block.length for block in blocks])
+        # compiled from the cues on demand (see rules.automaton)
+        self.automaton = None
+
+    def __deepcopy__(self, memo):
+        # the cues are immutable, only the blocks have to be copied
+        clone = object.__new__(type(self))
+        clone.size = self.size
+        clone.idx = self.idx
+        clone.blocks = [block.__deepcopy__(memo) for block in self.blocks]
+        clone.nums = self.nums
+        clone.shape = self.shape
+        clone.automaton = self.automaton
+        return clone
+
+    def ranges(self):
+        """Return the (start, end) pairs of the blocks: a cheap snapshot of
+        the mutable part of the meta data."""
+        return [(block.start, block.end) for block in self.blocks]
+
+    def set_ranges(self, ranges):
+        """Restore the ranges of the blocks from a snapshot."""
+        for block, (start, end) in zip(self.blocks, ranges):
+            block.start = start
+            block.end = end
+
+    def with_ranges(self, ranges):
+        """Return a new version of the line having the given (start, end)
+        pairs of the blocks. It shares the cues and the blocks whose range
+        doesn't change with this version, which must not be modified
+        afterwards."""
+        clone = object.__new__(type(self))
+        clone.size = self.size
+        clone.idx = self.idx
+        clone.blocks = [
+            blk if (blk.start, blk.end) == range_ else Block(*range_, blk.length)
+            for blk, range_ in zip(self.blocks, ranges)
+        ]
+        clone.nums = self.nums
+        clone.shape = self.shape
+        clone.automaton = self.automaton
+        return clone
 
     def __str__(self):
         str_ = "{!s}, size: {!s}, blocks: [".format(self.idx, self.size)
@@ -41,10 +105,8 @@ class Row(Line):
     """
 
     # pylint: disable=too-few-public-methods
-
-    def __init__(self, *args):
-        self.is_row = True
-        super(Row, self).__init__(*args)
+    __slots__ = ()
+    is_row = True
 
     def __str__(self):
         return "row: " + super(Row, self).__str__()
@@ -56,10 +118,8 @@ class Column(Line):
     """
 
     # pylint: disable=too-few-public-methods
-
-    def __init__(self, *args):
-        self.is_row = False
-        super(Column, self).__init__(*args)
+    __slots__ = ()
+    is_row = False
 
     def __str__(self):
         return "col: " + super(Column, self).__str__()
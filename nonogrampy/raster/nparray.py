@@ -0,0 +1,132 @@
+"""
+Nonogram model storing the cells in a 2-D NumPy array.
+
+NumPy is an optional dependency, import this module only if it's needed.
+"""
+
+import numpy as np
+
+from nonogrampy import DiscrepancyInModel
+from nonogrampy.raster import Raster
+from nonogrampy.raster import UNKNOWN
+
+
+class NumpyRaster(Raster):
+    """
+    Nonogram model storing the cells in a 2-D uint8 NumPy array. Rows and
+    columns are accessible as views for writing, updates are vectorized.
+
+    The lines are still copied to be read (see get_row and get_col): the
+    rules color the cells of their mask in place before the raster is
+    updated, so they can't be given a view of the array.
+    """
+
+    @property
+    def table(self):
+        """Return the copy of the internal table as a list of rows."""
+        return [bytearray(row.tobytes()) for row in self.grid]
+
+    @table.setter
+    def table(self, table):
+        """Replace the internal table with the list of rows."""
+        self._counts = None
+        self.grid = (
+            np.frombuffer(b"".join(table), dtype=np.uint8)
+            .reshape(len(table), -1)
+            .copy()
+        )
+        self._own_grid = True
+
+    def _copy_cells(self):
+        """Replace the internal array (shared with the original after a
+        shallow copy) with its copy."""
+        self.grid = self.grid.copy()
+        self._own_grid = True
+
+    def _share_cells(self):
+        """The array is copied as a whole when it's modified next time."""
+        self._own_grid = False
+
+    def _writable_grid(self):
+        """Return the internal array, copied first if it's shared with a
+        clone."""
+        if not self._own_grid:
+            self._copy_cells()
+
+        return self.grid
+
+    def row_view(self, idx):
+        """Returns the idx'th row of the internal table (not a copy), it's
+        writable (not shared with a clone)."""
+        return self._writable_grid()[idx]
+
+    def col_view(self, idx):
+        """Returns the idx'th column of the internal table (not a copy), it's
+        writable (not shared with a clone)."""
+        return self._writable_grid()[:, idx]
+
+    def get_row(self, idx):
+        """Returns the copy of the idx'th row of the internal table (the
+        bytes of the view are copied once more to the bytearray, it's still
+        faster than copying the view to a bytearray directly)."""
+        return bytearray(self.grid[idx].tobytes())
+
+    def get_col(self, idx):
+        """Returns the copy of the idx'th column of the internal table (see
+        get_row)."""
+        return bytearray(self.grid[:, idx].tobytes())
+
+    def update_row(self, idx=None, mask=None):
+        """Updates the UNKNOWN cells of the idx'th row based on the mask."""
+        modified_cells = self._update_view(self.row_view(idx), mask, idx, "row")
+        self._count_modified(True, idx, mask, modified_cells)
+
+        return modified_cells
+
+    def update_col(self, idx=None, mask=None):
+        """Updates the UNKNOWN cells of the idx'th column based on the mask."""
+        modified_cells = self._update_view(self.col_view(idx), mask, idx, "col")
+        self._count_modified(False, idx, mask, modified_cells)
+
+        return modified_cells
+
+    @staticmethod
+    def _update_view(view, mask, idx, type_):
+        """Updates the UNKNOWN cells of the view based on the mask and returns
+        the indices of the modified cells."""
+        # like Raster._update_list, ignore the cells beyond the end of the line
+        new = np.frombuffer(mask, dtype=np.uint8, count=len(view))
+        # most of the lines solved don't change, skip the vectorized
+        # operations (costly on short arrays) then
+        if view.tobytes() == new.tobytes():
+            return []
+
+        known = new != UNKNOWN
+
+        if (known & (view != UNKNOWN) & (view != new)).any():
+            raise DiscrepancyInModel(
+                "{}: {}, CURRENT: {!s} NEW: {!s}".format(
+                    type_, str(idx), bytearray(view.tobytes()), mask
+                )
+            )
+
+        modified_cells = np.flatnonzero(known & (view == UNKNOWN))
+        view[modified_cells] = new[modified_cells]
+
+        return modified_cells.tolist()
+
+    def _replace_row(self, row=None, idx=None):
+        """Replace the idx'th row of the internal table with the value in the
+        params."""
+        self._writable_grid()[idx] = np.frombuffer(bytes(row), dtype=np.uint8)
+
+    def _replace_col(self, col=None, idx=None):
+        """Replace the idx'th column of the internal table with the value in
+        the params."""
+        self._writable_grid()[:, idx] = np.frombuffer(bytes(col), dtype=np.uint8)
+
+    def set_cell(self, row_idx, col_idx, value):
+        """Set the cell of the internal table at the given position."""
+        if self._counts is not None:
+            self._counts.recolor(row_idx, col_idx, self.grid[row_idx, col_idx], value)
+        self._writable_grid()[row_idx, col_idx] = value
@@ -3,10 +3,31 @@ Module containing the rules that are used to solve the puzzle with logical
 elimination.
 """
 
-from nonogrampy.raster import BLACK
+import bisect
+import functools
+
 from nonogrampy.raster import UNKNOWN
-from nonogrampy.raster import WHITE
 from nonogrampy.raster.block import Block
+from nonogrampy.rules import bitset
+
+# number of masks whose runs are remembered
+_RUN_INDEX_CACHE_SIZE = 1024
+
+
+class _LazyJoin:
+    """
+    Joins the string representation of the items when it's formatted, ie.
+    only if the message is logged.
+    """
+
+    # pylint: disable=too-few-public-methods
+    __slots__ = ("items",)
+
+    def __init__(self, items):
+        self.items = items
+
+    def __str__(self):
+        return "; ".join(str(item) for item in self.items)
 
 
 def _covering_blocks(blocks, start, end=None):
@@ -17,39 +38,152 @@ def _covering_blocks(blocks, start, end=None):
     return [block for block in blocks if block.start <= start and block.end >= end]
 
 
+class _BlockIndex:
+    """
+    Answers which blocks of a line cover a section [start, end].
+
+    If both the starts and the ends of the blocks are in ascending order
+    (which is the case once R2.1 has been applied) the covering blocks form a
+    contiguous slice that's found by bisection, otherwise the blocks are
+    scanned.
+    """
+
+    def __init__(self, blocks):
+        self.blocks = blocks
+        self._starts = [block.start for block in blocks]
+        self._ends = [block.end for block in blocks]
+        self._lengths = [block.length for block in blocks]
+        # number of adjacent blocks that are out of order
+        self._unsorted = sum(self._out_of_order(idx) for idx in range(1, len(blocks)))
+
+    def _out_of_order(self, idx):
+        """Return whether the (idx - 1)'th and the idx'th blocks are out of
+        order."""
+        return (
+            self._starts[idx - 1] > self._starts[idx]
+            or self._ends[idx - 1] > self._ends[idx]
+        )
+
+    def refresh(self, idx):
+        """Update the index after the range of the idx'th block changed."""
+        pairs = [i for i in (idx, idx + 1) if 0 < i < len(self.blocks)]
+        self._unsorted -= sum(self._out_of_order(i) for i in pairs)
+        self._starts[idx] = self.blocks[idx].start
+        self._ends[idx] = self.blocks[idx].end
+        self._unsorted += sum(self._out_of_order(i) for i in pairs)
+
+    def covering_indices(self, start, end=None):
+        """Return the indices of the blocks that include [start, end]."""
+        if end is None:
+            end = start
+
+        if self._unsorted:
+            return [
+                idx
+                for idx in range(len(self.blocks))
+                if self._starts[idx] <= start and self._ends[idx] >= end
+            ]
+
+        return range(
+            bisect.bisect_left(self._ends, end),
+            bisect.bisect_right(self._starts, start),
+        )
+
+    def covering(self, start, end=None):
+        """Return the blocks that include [start, end]."""
+        return [self.blocks[idx] for idx in self.covering_indices(start, end)]
+
+    def min_length(self, start, end=None):
+        """Return the minimal length of the blocks that include [start, end]
+        or 0 if there's no such block."""
+        return min(
+            (self._lengths[idx] for idx in self.covering_indices(start, end)),
+            default=0,
+        )
+
+    def max_length_other(self, idx, start, end=None):
+        """Return the maximal length of the blocks other than the idx'th one
+        that include [start, end] or None if there's no such block."""
+        return max(
+            (self._lengths[i] for i in self.covering_indices(start, end) if i != idx),
+            default=None,
+        )
+
+    def covered_by_other(self, idx, start, end=None):
+        """Return whether [start, end] is included in a block other than the
+        idx'th one."""
+        indices = self.covering_indices(start, end)
+        return len(indices) > (idx in indices)
+
+
+class _RunIndex:
+    """
+    The black runs and the non-white runs of a mask sorted by their start
+    index, with range queries by position.
+
+    The runs are shared by all the users of the index so they must not be
+    modified.
+    """
+
+    def __init__(self, mask):
+        self.black_runs = [
+            Block(start, end, length=end - start + 1)
+            for start, end in bitset.runs(bitset.black_bits(mask))
+        ]
+        self.non_white_runs = [
+            Block(start, end, length=end - start + 1)
+            for start, end in bitset.runs(bitset.non_white_bits(mask))
+        ]
+        # runs don't overlap so both their starts and ends are sorted
+        self._starts = [run.start for run in self.black_runs]
+        self._ends = [run.end for run in self.black_runs]
+
+    def runs_within(self, start, end):
+        """Return the black runs that are within [start, end] entirely."""
+        first = bisect.bisect_left(self._starts, start)
+        last = bisect.bisect_right(self._ends, end)
+        return self.black_runs[first:last]
+
+    def runs_starting_within(self, start, end):
+        """Return the black runs that start within [start, end]."""
+        first = bisect.bisect_left(self._starts, start)
+        last = bisect.bisect_right(self._starts, end)
+        return self.black_runs[first:last]
+
+    def runs_ending_within(self, start, end):
+        """Return the black runs that end within [start, end]."""
+        first = bisect.bisect_left(self._ends, start)
+        last = bisect.bisect_right(self._ends, end)
+        return self.black_runs[first:last]
+
+
+@functools.lru_cache(maxsize=_RUN_INDEX_CACHE_SIZE)
+def _cached_run_index(mask):
+    """Return the run index of the (immutable) mask."""
+    return _RunIndex(mask)
+
+
+def _run_index(mask):
+    """Return the run index of the current content of the mask. It's computed
+    only once for a given content, so a new one is built only if the mask
+    has been written since the last call. The content is copied to look it up,
+    so each call is still O(n): the rules look it up once per invocation and
+    pass it to the range queries below."""
+    return _cached_run_index(bytes(mask))
+
+
 def _get_black_runs(mask):
     """Returns those runs start and end indices that don't contain any
     WHITE or UNKNOWN cell."""
-    res = []
-    size = len(mask)
-    start = 0
-    while start < size:
-        # if we found a black cell
-        if mask[start] == BLACK:
-            end = size - 1
-
-            # look ahead if we find a black cell or reach the end
-            for idx in range(start, size):
-                if mask[idx] != BLACK:
-                    end = idx - 1
-                    break
-
-            res.append(Block(start, end, length=end - start + 1))
-
-            start = end + 1
-        else:
-            start += 1
+    return list(_run_index(mask).black_runs)
 
-    return res
 
-
-def _runs_in_block_range(block, mask):
-    """Return the runs that are within the block range entirely."""
-    return [
-        run
-        for run in _get_black_runs(mask)
-        if block.start <= run.start and run.end <= block.end
-    ]
+def _runs_in_block_range(block, mask, runs=None):
+    """Return the runs that are within the block range entirely. runs is the
+    run index of the mask if the caller has it already."""
+    if runs is None:
+        runs = _run_index(mask)
+    return runs.runs_within(block.start, block.end)
 
 
 def _is_segment_in_block_range(segment, blocks):
@@ -63,23 +197,7 @@ def _is_segment_in_block_range(segment, blocks):
 
 def _get_non_white_runs(mask):
     """Returns those runs that are delimeted by white cells."""
-    res = []
-    in_a_block = False
-    last_idx = len(mask) - 1
-    for idx, cell in enumerate(mask):
-        if cell != WHITE and not in_a_block:
-            in_a_block = True
-            start = idx
-
-        if cell == WHITE and in_a_block:
-            in_a_block = False
-            end = idx - 1
-            res.append(Block(start, end, length=end - start + 1))
-
-        if idx == last_idx and in_a_block:
-            res.append(Block(start, last_idx, length=last_idx - start + 1))
-
-    return res
+    return list(_run_index(mask).non_white_runs)
 
 
 def _block_len_in_section(block, section):
@@ -90,20 +208,17 @@ def _block_len_in_section(block, section):
     return len_end - len_start + 1
 
 
-def _runs_starting_in_block_range(block, mask):
+def _runs_starting_in_block_range(block, mask, runs=None):
     """Return the runs that start within the block range and may end
-    outside."""
-    return [
-        run
-        for run in _get_black_runs(mask)
-        if block.start <= run.start and run.start <= block.end
-    ]
-
-
-def _runs_ending_in_block_range(block, mask):
-    """Return the runs that end within the block range and may start before"""
-    return [
-        run
-        for run in _get_black_runs(mask)
-        if block.start <= run.end and run.end <= block.end
-    ]
+    outside (see _runs_in_block_range for runs)."""
+    if runs is None:
+        runs = _run_index(mask)
+    return runs.runs_starting_within(block.start, block.end)
+
+
+def _runs_ending_in_block_range(block, mask, runs=None):
+    """Return the runs that end within the block range and may start before
+    (see _runs_in_block_range for runs)"""
+    if runs is None:
+        runs = _run_index(mask)
+    return runs.runs_ending_within(block.start, block.end)
@@ -0,0 +1,149 @@
+"""
+Complete line solver based on the automaton compiled from the cues.
+
+The cues of a line are compiled to a nondeterministic finite automaton
+accepting the lines consistent with them. The set of the states is a bitset
+(a Python int), so a step of the automaton is a few integer operations and a
+line is solved by a forward and a backward pass over the mask.
+"""
+
+import dataclasses
+
+import nonogrampy
+from nonogrampy import DiscrepancyInModel
+from nonogrampy.raster import BLACK
+from nonogrampy.raster import UNKNOWN
+from nonogrampy.raster import WHITE
+
+
+@dataclasses.dataclass(frozen=True)
+class Automaton:
+    """
+    Automaton accepting the lines consistent with the cues.
+
+    The pattern of the cues is the sequence of the cells of the blocks with a
+    single WHITE cell between them (eg. "XX X" for the cues 2 1), the i'th
+    state means that the first i cells of the pattern have been matched.
+    """
+
+    # pylint: disable=too-few-public-methods
+    nstates: int
+    # states having a BLACK transition to the next state
+    black: int
+    # states having a WHITE transition to the next state
+    white: int
+    # states having a WHITE transition to themselves
+    loop: int
+    # state before the first and the last cell of each block
+    firsts: tuple
+    lasts: tuple
+
+    @classmethod
+    def compile(cls, lengths):
+        """Return the automaton of the block lengths."""
+        black = white = 0
+        firsts, lasts = [], []
+        # the WHITE cells before the first block
+        loop = 1
+        state = 0
+        for idx, length in enumerate(lengths):
+            firsts.append(state)
+            lasts.append(state + length - 1)
+            black |= ((1 << length) - 1) << state
+            state += length
+            if idx < len(lengths) - 1:
+                white |= 1 << state
+                state += 1
+            # any WHITE cells after the block
+            loop |= 1 << state
+
+        return cls(state + 1, black, white, loop, tuple(firsts), tuple(lasts))
+
+    def step(self, states, cell):
+        """Return the states reachable from the states by the cell."""
+        res = 0
+        if cell != WHITE:
+            res |= (states & self.black) << 1
+        if cell != BLACK:
+            res |= (states & self.loop) | ((states & self.white) << 1)
+        return res
+
+    def step_back(self, states, cell):
+        """Return the states from which the states are reachable by the
+        cell."""
+        res = 0
+        if cell != WHITE:
+            res |= (states >> 1) & self.black
+        if cell != BLACK:
+            res |= (states & self.loop) | ((states >> 1) & self.white)
+        return res
+
+
+def compile_line(meta):
+    """Return the automaton of the line, compiled only once per line (the
+    copies of the line share it)."""
+    if meta.automaton is None:
+        meta.automaton = Automaton.compile(
+            [block.length for block in meta.blocks if block.length > 0]
+        )
+    return meta.automaton
+
+
+@nonogrampy.log_changes("A")
+def fill_forced_cells(mask, meta):
+    """Color every cell that is BLACK (or WHITE) in all the lines consistent
+    with the mask and the cues and narrow the range of each block to its
+    leftmost start and rightmost end.
+
+    Runs in O(n) steps of the automaton, where n is the size of the line.
+    """
+    force_cells(mask, meta, "A")
+
+
+def force_cells(mask, meta, rule):
+    """The implementation of fill_forced_cells, the discrepancy raised is
+    reported as detected by the rule."""
+    automaton = compile_line(meta)
+    size = meta.size
+
+    # forward[i]: the states reachable by mask[:i]
+    forward = [1]
+    for cell in mask[:size]:
+        forward.append(automaton.step(forward[-1], cell))
+
+    if not forward[size] >> (automaton.nstates - 1) & 1:
+        raise DiscrepancyInModel(
+            "{}: the blocks cannot be placed - '{}', meta: {}".format(
+                rule, mask.decode("ascii"), meta
+            )
+        )
+
+    # the states of the accepting paths before cell i (backward) and the
+    # states before the BLACK cells of the accepting paths (blacks)
+    backward = 1 << (automaton.nstates - 1)
+    blacks = [0] * size
+    for i in range(size - 1, -1, -1):
+        states = forward[i]
+        cell = mask[i]
+        blacks[i] = states & automaton.black & (backward >> 1) if cell != WHITE else 0
+        can_be_white = cell != BLACK and (
+            (states & automaton.loop & backward)
+            or (states & automaton.white & (backward >> 1))
+        )
+        backward = automaton.step_back(backward, cell) & states
+
+        if cell == UNKNOWN:
+            if not can_be_white:
+                mask[i] = BLACK
+            elif not blacks[i]:
+                mask[i] = WHITE
+
+    blocks = [block for block in meta.blocks if block.length > 0]
+    for block, first, last in zip(blocks, automaton.firsts, automaton.lasts):
+        block.start = next(i for i in range(size) if blacks[i] >> first & 1)
+        block.end = next(i for i in range(size - 1, -1, -1) if blacks[i] >> last & 1)
+
+
+RULES = (fill_forced_cells,)
+
+__all__ = ("RULES",)
@@ -0,0 +1,49 @@
+"""
+Bitset representation of the cells of a line (Python ints, the i'th bit of
+which is set if the i'th cell of the line has the given color) to find the
+runs of the line.
+"""
+
+from nonogrampy.raster import BLACK
+from nonogrampy.raster import UNKNOWN
+from nonogrampy.raster import WHITE
+
+_COLORS = bytes((BLACK, WHITE, UNKNOWN))
+_BLACK_DIGITS = bytes.maketrans(_COLORS, b"100")
+_NON_WHITE_DIGITS = bytes.maketrans(_COLORS, b"101")
+
+
+def _to_bits(mask, digits):
+    """Return the bitset of the cells that are translated to "1"."""
+    if not mask:
+        return 0
+
+    # the first cell is the least significant bit
+    return int(mask.translate(digits)[::-1], 2)
+
+
+def black_bits(mask):
+    """Return the bitset of the BLACK cells of the mask."""
+    return _to_bits(mask, _BLACK_DIGITS)
+
+
+def non_white_bits(mask):
+    """Return the bitset of the BLACK and UNKNOWN cells of the mask."""
+    return _to_bits(mask, _NON_WHITE_DIGITS)
+
+
+def runs(bits):
+    """Return the (start, end) index pairs of the runs of set bits in
+    ascending order."""
+    res = []
+    # the first and the last bit of each run
+    starts = bits & ~(bits << 1)
+    ends = bits & ~(bits >> 1)
+    while starts:
+        first_start = starts & -starts
+        first_end = ends & -ends
+        res.append((first_start.bit_length() - 1, first_end.bit_length() - 1))
+        starts ^= first_start
+        ends ^= first_end
+
+    return res
@@ -0,0 +1,106 @@
+"""
+Closed form solvers of the lines having trivial cues (see the SHAPE_*
+constants of nonogrampy.raster.line).
+
+Each of them finds every cell that has the same color in all the placements
+of the blocks consistent with the mask in linear time.
+"""
+
+import nonogrampy
+from nonogrampy import DiscrepancyInModel
+from nonogrampy.raster import BLACK
+from nonogrampy.raster import WHITE
+
+
+def _fill(mask, start, end, color, meta):
+    """Color the cells in [start, end) or raise DiscrepancyInModel if any of
+    them has the other color."""
+    if start >= end:
+        return
+
+    other = WHITE if color == BLACK else BLACK
+    if mask.find(other, start, end) != -1:
+        raise DiscrepancyInModel(
+            "'{}' cannot be colored in [{}, {}), meta: {}".format(
+                mask.decode("ascii"), start, end, meta
+            )
+        )
+    mask[start:end] = bytes([color]) * (end - start)
+
+
+@nonogrampy.log_changes("C.empty")
+def solve_empty(mask, meta):
+    """All the cells of a line without blocks are left empty."""
+    _fill(mask, 0, meta.size, WHITE, meta)
+
+
+@nonogrampy.log_changes("C.full")
+def solve_full(mask, meta):
+    """The blocks fill the line with single empty cells between them, so
+    there's only one placement."""
+    pos = 0
+    for block in meta.blocks:
+        end = pos + block.length
+        if pos < block.start or end - 1 > block.end:
+            raise DiscrepancyInModel("range doesn't fit, meta: " + str(meta))
+
+        block.start, block.end = pos, end - 1
+        _fill(mask, pos, end, BLACK, meta)
+        # the space after the block (if it's not the last one)
+        _fill(mask, end, min(end + 1, meta.size), WHITE, meta)
+        pos = end + 1
+
+
+@nonogrampy.log_changes("C.single")
+def solve_single(mask, meta):
+    """Find the leftmost and the rightmost placement of the only block:
+    the cells outside of both are left empty and their overlap is colored.
+    The segments between them too short for the block are left empty."""
+    block = meta.blocks[0]
+    length = block.length
+
+    # the block has to cover the first and the last BLACK cells
+    first_black = mask.find(BLACK, 0, meta.size)
+    last_black = mask.rfind(BLACK, 0, meta.size)
+    lowest = block.start
+    highest = block.end - length + 1
+    if first_black != -1:
+        lowest = max(lowest, last_black - length + 1)
+        highest = min(highest, first_black)
+
+    # skip the placements covering a WHITE cell
+    left = lowest
+    while left <= highest:
+        white = mask.rfind(WHITE, left, left + length)
+        if white == -1:
+            break
+        left = white + 1
+
+    right = highest
+    while right >= left:
+        white = mask.find(WHITE, right, right + length)
+        if white == -1:
+            break
+        right = white - length
+
+    if left > highest or right < left:
+        raise DiscrepancyInModel(
+            "the block cannot be placed - '{}', meta: {}".format(
+                mask.decode("ascii"), meta
+            )
+        )
+
+    block.start = left
+    block.end = right + length - 1
+    _fill(mask, 0, block.start, WHITE, meta)
+    _fill(mask, block.end + 1, meta.size, WHITE, meta)
+    _fill(mask, right, left + length, BLACK, meta)
+
+    pos = left
+    while pos <= block.end:
+        white = mask.find(WHITE, pos, block.end + 1)
+        if white == -1:
+            white = block.end + 1
+        if white - pos < length:
+            _fill(mask, pos, white, WHITE, meta)
+        pos = white + 1
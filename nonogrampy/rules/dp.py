@@ -0,0 +1,172 @@
+"""
+Complete line solver based on dynamic programming.
+
+Unlike the rules of the paper, it finds every cell that has the same color in
+all the placements of the blocks that are consistent with the mask.
+"""
+
+import nonogrampy
+from nonogrampy import DiscrepancyInModel
+from nonogrampy.raster import BLACK
+from nonogrampy.raster import UNKNOWN
+from nonogrampy.raster import WHITE
+
+
+def _prefix_counts(mask, color):
+    """Return the list whose i'th element is the number of cells of the given
+    color in mask[:i]."""
+    res = [0]
+    for cell in mask:
+        res.append(res[-1] + (cell == color))
+
+    return res
+
+
+def _fits(whites, start, length):
+    """Return whether a block of the given length can be placed at start, ie.
+    there's no WHITE cell in mask[start:start + length]."""
+    return whites[start + length] == whites[start]
+
+
+def _leftmost_table(mask, lengths, whites, blacks):
+    """Return the table whose [j][i] element tells whether the first j blocks
+    can be placed in mask[:i]."""
+    size = len(mask)
+    table = [bytearray(size + 1) for _ in range(len(lengths) + 1)]
+
+    for i in range(size + 1):
+        table[0][i] = blacks[i] == 0
+
+    for j, length in enumerate(lengths, start=1):
+        prev, act = table[j - 1], table[j]
+        for i in range(length, size + 1):
+            # cell i - 1 is WHITE and the blocks fit in mask[:i - 1]
+            if mask[i - 1] != BLACK and act[i - 1]:
+                act[i] = 1
+                continue
+
+            # or the j'th block ends at cell i - 1
+            start = i - length
+            if not _fits(whites, start, length):
+                continue
+            if start == 0:
+                act[i] = prev[0]
+            else:
+                act[i] = mask[start - 1] != BLACK and prev[start - 1]
+
+    return table
+
+
+def _rightmost_table(mask, lengths, whites, blacks):
+    """Return the table whose [j][i] element tells whether the blocks from
+    the j'th one can be placed in mask[i:]."""
+    size = len(mask)
+    nblocks = len(lengths)
+    table = [bytearray(size + 1) for _ in range(nblocks + 1)]
+
+    for i in range(size + 1):
+        table[nblocks][i] = blacks[size] == blacks[i]
+
+    for j in range(nblocks - 1, -1, -1):
+        length = lengths[j]
+        next_, act = table[j + 1], table[j]
+        for i in range(size - length, -1, -1):
+            # cell i is WHITE and the blocks fit in mask[i + 1:]
+            if mask[i] != BLACK and act[i + 1]:
+                act[i] = 1
+                continue
+
+            # or the j'th block starts at cell i
+            if not _fits(whites, i, length):
+                continue
+            end = i + length
+            if end == size:
+                act[i] = next_[size]
+            else:
+                act[i] = mask[end] != BLACK and next_[end + 1]
+
+    return table
+
+
+def _valid_starts(mask, lengths, j, left, right, whites):
+    """Return the start indices where the j'th block can be placed in a
+    solution consistent with the mask."""
+    size = len(mask)
+    length = lengths[j]
+    res = []
+    for start in range(size - length + 1):
+        if not _fits(whites, start, length):
+            continue
+
+        if start == 0:
+            if not left[j][0]:
+                continue
+        elif mask[start - 1] == BLACK or not left[j][start - 1]:
+            continue
+
+        end = start + length
+        if end == size:
+            if not right[j + 1][size]:
+                continue
+        elif mask[end] == BLACK or not right[j + 1][end + 1]:
+            continue
+
+        res.append(start)
+
+    return res
+
+
+@nonogrampy.log_changes("DP")
+def fill_forced_cells(mask, meta):
+    """Color every cell that is BLACK (or WHITE) in all the placements of the
+    blocks consistent with the mask and narrow the range of each block to its
+    leftmost start and rightmost end.
+
+    Runs in O(n * k) where n is the size of the line and k is the number of
+    blocks.
+    """
+    blocks = [block for block in meta.blocks if block.length > 0]
+    lengths = [block.length for block in blocks]
+    size = len(mask)
+    whites = _prefix_counts(mask, WHITE)
+    blacks = _prefix_counts(mask, BLACK)
+
+    left = _leftmost_table(mask, lengths, whites, blacks)
+    if not left[len(lengths)][size]:
+        raise DiscrepancyInModel(
+            "DP: the blocks cannot be placed - '{}', meta: {}".format(
+                mask.decode("ascii"), meta
+            )
+        )
+    right = _rightmost_table(mask, lengths, whites, blacks)
+
+    # number of valid block placements covering each cell (difference array)
+    covered = [0] * (size + 1)
+    for j, block in enumerate(blocks):
+        starts = _valid_starts(mask, lengths, j, left, right, whites)
+        for start in starts:
+            covered[start] += 1
+            covered[start + block.length] -= 1
+
+        block.start = starts[0]
+        block.end = starts[-1] + block.length - 1
+
+    nblocks = len(lengths)
+    running = 0
+    for i in range(size):
+        running += covered[i]
+        if mask[i] != UNKNOWN:
+            continue
+
+        # the cell can be WHITE if the first j blocks fit before it and the
+        # rest of them after it
+        can_be_white = any(left[j][i] and right[j][i + 1] for j in range(nblocks + 1))
+        if not can_be_white:
+            mask[i] = BLACK
+        elif not running:
+            mask[i] = WHITE
+
+
+RULES = (fill_forced_cells,)
+
+__all__ = ("RULES",)
@@ -0,0 +1,38 @@
+"""
+Initial narrowing of the ranges of the blocks applied before the propagation.
+"""
+
+import nonogrampy
+from nonogrampy.raster import BLACK
+
+
+@nonogrampy.log_changes("P")
+def pack_blocks(mask, meta):
+    """Narrow the range of each block to the span between its position in
+    the leftmost and in the rightmost packing of the blocks (ie. the blocks
+    pushed to the start or the end of the line with a single space between
+    them) and color the cells covered by the block in both packings.
+    """
+    # leftmost packing
+    pos = 0
+    for block in meta.blocks:
+        block.start = max(block.start, pos)
+        pos = block.start + block.length + 1
+
+    # rightmost packing
+    pos = meta.size - 1
+    for block in reversed(meta.blocks):
+        block.end = min(block.end, pos)
+        pos = block.end - block.length - 1
+
+    for block in meta.blocks:
+        # the overlap of the leftmost and the rightmost position
+        lb = block.end - block.length + 1
+        ub = block.start + block.length
+        if lb < ub:
+            mask[lb:ub] = bytes([BLACK]) * (ub - lb)
+
+
+RULES = (pack_blocks,)
+
+__all__ = ("RULES",)
@@ -9,6 +9,12 @@ from nonogrampy.raster import UNKNOWN
 from nonogrampy.raster import WHITE
 
 
+def _fill_white(mask, start, end):
+    """Leave the cells in [start, end) empty."""
+    if start < end:
+        mask[start:end] = bytes([WHITE]) * (end - start)
+
+
 # pylint: disable=protected-access
 @nonogrampy.log_changes("R1.1")
 def fill_intersections(mask, meta):
@@ -55,15 +61,12 @@ def check_spaces(mask, meta):
         mask[:] = [WHITE] * meta.size
     else:
         # (1)
-        for i in range(meta.blocks[0].start):
-            mask[i] = WHITE
+        _fill_white(mask, 0, meta.blocks[0].start)
         # (2)
-        for i in range(meta.blocks[-1].end + 1, meta.size):
-            mask[i] = WHITE
+        _fill_white(mask, meta.blocks[-1].end + 1, meta.size)
         # (3)
         for j in range(len(meta.blocks) - 1):
-            for i in range(meta.blocks[j].end + 1, meta.blocks[j + 1].start):
-                mask[i] = WHITE
+            _fill_white(mask, meta.blocks[j].end + 1, meta.blocks[j + 1].start)
 
 
 @nonogrampy.log_changes("R1.3")
@@ -80,37 +83,26 @@ def mark_white_cell_at_boundary(mask, meta):
     if UNKNOWN not in mask:
         return
 
-    for idx in range(len(meta.blocks)):
-        block = meta.blocks[idx]
-        blocks_wo_this = [meta.blocks[i] for i in range(len(meta.blocks)) if idx != i]
-
+    index = rules._BlockIndex(meta.blocks)
+    for idx, block in enumerate(meta.blocks):
         # if the start of the block is BLACK and the preceding cell is
         # UNKNOWN
         if (
             mask[block.start] == BLACK
             and block.start - 1 >= 0
             and mask[block.start - 1] == UNKNOWN
+            and index.max_length_other(idx, block.start) == 1
         ):
-            covering_blocks = rules._covering_blocks(blocks_wo_this, block.start)
-
-            if (
-                covering_blocks
-                and max([block.length for block in covering_blocks]) == 1
-            ):
-                mask[block.start - 1] = WHITE
+            mask[block.start - 1] = WHITE
 
         # if the end of the block is BLACK and the next cell is UNKNOWN
         if (
             mask[block.end] == BLACK
             and block.end + 1 < len(mask)
             and mask[block.end + 1] == UNKNOWN
+            and index.max_length_other(idx, block.end) == 1
         ):
-            covering_blocks = rules._covering_blocks(blocks_wo_this, block.end)
-            if (
-                covering_blocks
-                and max([block.length for block in covering_blocks]) == 1
-            ):
-                mask[block.end + 1] = WHITE
+            mask[block.end + 1] = WHITE
 
 
 @nonogrampy.log_changes("R1.4")
@@ -164,11 +156,11 @@ def fill_cells_based_on_boundary(mask, meta):
         return
 
     # pylint: disable=invalid-name
+    index = rules._BlockIndex(meta.blocks)
     for i in range(1, len(mask) - 1):
-        covering_blocks = rules._covering_blocks(meta.blocks, i)
-        minL = 0
-        if covering_blocks:
-            minL = min([block.length for block in covering_blocks])
+        if mask[i] != BLACK:
+            continue
+        minL = index.min_length(i)
 
         found_empty = 0
         m, n = -1, -1
@@ -218,8 +210,9 @@ def mark_boundary_if_possible(mask, meta):
     if UNKNOWN not in mask:
         return
 
+    index = rules._BlockIndex(meta.blocks)
     for block in rules._get_black_runs(mask):
-        covering_blocks = rules._covering_blocks(meta.blocks, block.start, block.end)
+        covering_blocks = index.covering(block.start, block.end)
 
         same_length = 1
         for cov in covering_blocks:
@@ -61,9 +61,10 @@ def narrow_boundaries(mask, meta):
     rj.e = (i.s − 2), if black segment i only belongs to the later black
                         runs of run j
     """
+    runs = rules._run_index(mask)
     for block_idx, block in enumerate(meta.blocks):
 
-        runs_in_block_range = rules._runs_in_block_range(block, mask)
+        runs_in_block_range = rules._runs_in_block_range(block, mask, runs)
 
         # runs in the block's range that are longer than the block length
         for black_segment in [
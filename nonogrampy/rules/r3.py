@@ -23,9 +23,12 @@ def fill_scattered_ranges(mask, meta):
     where u = LBj - (n - m + 1)
 
     """
-    for block in meta.blocks:
+    index = rules._BlockIndex(meta.blocks)
+    run_index = rules._run_index(mask)
+    for idx, block in enumerate(meta.blocks):
         runs = sorted(
-            rules._runs_in_block_range(block, mask), key=lambda block: block.start
+            rules._runs_in_block_range(block, mask, run_index),
+            key=lambda block: block.start,
         )
 
         if not runs:
@@ -33,20 +36,19 @@ def fill_scattered_ranges(mask, meta):
 
         (first, last) = (runs[0].start, runs[-1].end)
 
-        blocks_wo_this = [blk for blk in meta.blocks if blk != block]
-
         # if the black run is covered only by the current block
         # ie. it is not covered by any of the other blocks...
         # TODO: check whether there's a covering block between (first,
         # last) not covering these two
         if (
-            not rules._covering_blocks(blocks_wo_this, first)
-            and not rules._covering_blocks(blocks_wo_this, last)
+            not index.covered_by_other(idx, first)
+            and not index.covered_by_other(idx, last)
             and block.length >= (last - first + 1)
         ):
             # update mask
             if first < last:
                 mask[first : last + 1] = [BLACK] * (last - first + 1)
+                run_index = rules._run_index(mask)
 
             # len of the run
             runlen = block.length - (last - first + 1)
@@ -58,6 +60,8 @@ def fill_scattered_ranges(mask, meta):
             if block.end > last + runlen:
                 block.end = last + runlen
 
+            index.refresh(idx)
+
 
 @nonogrampy.log_changes("R3.2")
 def adjust_ranges_based_on_white_cells(mask, meta):
@@ -90,19 +94,16 @@ def adjust_ranges_based_on_white_cells(mask, meta):
 
     non_white_runs = rules._get_non_white_runs(mask)
 
-    logging.debug(
-        "R3.2 non_white_runs: [%s]", "; ".join((str(block) for block in non_white_runs))
-    )
+    logging.debug("R3.2 non_white_runs: [%s]", rules._LazyJoin(non_white_runs))
 
-    for block in meta.blocks:
+    index = rules._BlockIndex(meta.blocks)
+    for idx, block in enumerate(meta.blocks):
         # iterate only over those runs that start or end within this block
         covered_runs = [
             r for r in non_white_runs if block.start <= r.end and block.end >= r.start
         ]
         logging.debug(
-            "R3.2 block: %s, covered_runs: [%s]",
-            block,
-            "; ".join((str(block) for block in covered_runs)),
+            "R3.2 block: %s, covered_runs: [%s]", block, rules._LazyJoin(covered_runs)
         )
 
         # Step 1.
@@ -145,7 +146,7 @@ def adjust_ranges_based_on_white_cells(mask, meta):
                 break
 
         # Step 5.
-        blocks_wo_this = [blk for blk in meta.blocks if blk != block]
+        index.refresh(idx)
 
         # recompute covered_runs?
 
@@ -160,7 +161,7 @@ def adjust_ranges_based_on_white_cells(mask, meta):
                 # if run is entirely within the boundaries of this block
                 block.start <= run.start
                 and run.end <= block.end
-                and not rules._covering_blocks(blocks_wo_this, run.start, run.end)
+                and not index.covered_by_other(idx, run.start, run.end)
                 and rules._block_len_in_section(run, block) < block.length
             ):
                 logging.debug("R3.2 step 5: mark run as white: %s", run)
@@ -234,12 +235,18 @@ def rule_3_3_1(mask, meta):
         block.end = block.start + block.length - 1
         # (4)
         if prev_block and prev_block.end == block.start - 1:
-            assert block.start - 2 > 0
+            if block.start < 2:
+                raise DiscrepancyInModel(
+                    "R3.3-1: no room for the previous block, meta: {}".format(meta)
+                )
             prev_block.end = block.start - 2
 
         # (3)
         if next_block and next_block.start < block.end + 2:
-            assert block.end + 2 < meta.size
+            if block.end + 2 >= meta.size:
+                raise DiscrepancyInModel(
+                    "R3.3-1: no room for the next block, meta: {}".format(meta)
+                )
             next_block.start = block.end + 2
 
 
@@ -259,17 +266,11 @@ def rule_3_3_2(mask, meta):
         if prev_block and prev_block.end >= block.start:
             continue
 
-        first_black_cell_idx = meta.size
-        for cell_idx in range(block.start, block.end + 1):
-            if mask[cell_idx] == BLACK:
-                first_black_cell_idx = cell_idx
-                break
+        first_black_cell_idx = mask.find(BLACK, block.start, block.end + 1)
+        if first_black_cell_idx < 0:
+            continue
 
-        first_white_cell_idx = -1
-        for cell_idx in range(first_black_cell_idx, block.end + 1):
-            if mask[cell_idx] == WHITE:
-                first_white_cell_idx = cell_idx
-                break
+        first_white_cell_idx = mask.find(WHITE, first_black_cell_idx, block.end + 1)
 
         if first_black_cell_idx < first_white_cell_idx:
             block.end = first_white_cell_idx - 1
@@ -295,6 +296,7 @@ def rule_3_3_3_1(mask, meta):
     Otherwise, m = m + 1 and go to step (4).
     """
     # pylint: disable=invalid-name
+    runs = rules._run_index(mask)
     for idx in range(len(meta.blocks)):
         prev_block = meta.blocks[idx - 1] if idx > 0 else None
         block = meta.blocks[idx]
@@ -303,7 +305,7 @@ def rule_3_3_3_1(mask, meta):
         if prev_block and prev_block.end >= block.start:
             continue
 
-        runs_in_range = rules._runs_starting_in_block_range(block, mask)
+        runs_in_range = rules._runs_starting_in_block_range(block, mask, runs)
         for i in range(len(runs_in_range)):
             run_start = runs_in_range[i].start
             for m in range(i + 1, len(runs_in_range)):
@@ -337,6 +339,7 @@ def rule_3_3_3_2(mask, meta):
     Otherwise, m = m - 1 and go to step (4).
     """
     # pylint: disable=invalid-name
+    runs = rules._run_index(mask)
     for idx in range(len(meta.blocks) - 1, -1, -1):
         prev_block = meta.blocks[idx + 1] if idx + 1 < len(meta.blocks) else None
         block = meta.blocks[idx]
@@ -345,7 +348,7 @@ def rule_3_3_3_2(mask, meta):
         if prev_block and block.end >= prev_block.start:
             continue
 
-        runs_in_range = rules._runs_ending_in_block_range(block, mask)
+        runs_in_range = rules._runs_ending_in_block_range(block, mask, runs)
         for i in range(len(runs_in_range) - 1, -1, -1):
             run_end = runs_in_range[i].end
             for m in range(i - 1, -1, -1):
@@ -0,0 +1,28 @@
+"""
+Lookahead rule completing the lines where the rules of the paper stall.
+"""
+
+import nonogrampy
+from nonogrampy.rules import automaton
+
+
+@nonogrampy.log_changes("R4")
+def fill_by_lookahead(mask, meta):
+    """Rule 4:
+
+    For each UNKNOWN cell of the line, test whether the cues admit a
+    placement of the blocks with the cell colored BLACK and with the cell
+    left empty. If only one of them is admitted, the cell gets that color.
+    The range of each block is narrowed to its leftmost start and rightmost
+    end among the placements.
+
+    The tests of all the cells are the forward and the backward pass of the
+    automaton compiled from the cues (see rules.automaton), so the rule runs
+    in O(n) steps instead of a placement search per cell.
+    """
+    automaton.force_cells(mask, meta, "R4")
+
+
+RULES = (fill_by_lookahead,)
+
+__all__ = ("RULES",)
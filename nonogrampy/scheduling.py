@@ -0,0 +1,52 @@
+"""
+Adaptive scheduling of the rules applied on the lines.
+"""
+
+
+def _key(meta):
+    """Return the key identifying the line."""
+    return (meta.is_row, meta.idx)
+
+
+class RuleScheduler:
+    """
+    Skips the rules that didn't change a line in the last "patience" number of
+    times they were applied on it.
+
+    The lines solved with some of the rules skipped are remembered as
+    unverified, they should be solved with all the rules again before a
+    fixpoint is declared.
+    """
+
+    def __init__(self, patience):
+        self.patience = patience
+        # number of times in a row a rule didn't change the line
+        self._idle = {}
+        self._unverified = {}
+
+    def skip(self, meta, rule_idx):
+        """Return whether the rule should be skipped on the line."""
+        idle = self._idle.get(_key(meta))
+        return idle is not None and idle[rule_idx] >= self.patience
+
+    def record(self, meta, rule_idx, nrules, changed):
+        """Record whether the rule changed the line."""
+        idle = self._idle.setdefault(_key(meta), [0] * nrules)
+        idle[rule_idx] = 0 if changed else idle[rule_idx] + 1
+
+    def done(self, meta, complete):
+        """Record whether all the rules were applied on the line."""
+        if complete:
+            self._unverified.pop(_key(meta), None)
+        else:
+            self._unverified[_key(meta)] = meta
+
+    def take_unverified(self):
+        """Return the unverified lines and make sure that all the rules are
+        applied on them next time."""
+        lines = list(self._unverified.values())
+        for meta in lines:
+            self._idle.pop(_key(meta), None)
+        self._unverified.clear()
+
+        return lines
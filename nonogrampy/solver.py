@@ -2,109 +2,731 @@
 Implementation of the logic to solve the nonogram.
 """
 
+import collections
+import contextlib
 import copy
+import dataclasses
+import heapq
+import itertools
 import logging
 import sys
+import typing
 
 from nonogrampy import rules as r
 from nonogrampy.rules import r1
 from nonogrampy.rules import r2
 from nonogrampy.rules import r3
+from nonogrampy.rules import r4
+from nonogrampy.rules import dp
+from nonogrampy.rules import automaton
+from nonogrampy.rules import closed
+from nonogrampy.rules import packing
+from nonogrampy.cache import LineCache
+from nonogrampy.profiling import RuleProfile
+from nonogrampy.scheduling import RuleScheduler
 from nonogrampy.solution import Solution
+from nonogrampy.table import LineTable
+from nonogrampy.trace import Tracer
+from nonogrampy.trail import Trail
 from nonogrampy import DiscrepancyInModel
 from nonogrampy import raster as rstr
+from nonogrampy.raster import line
+from nonogrampy.raster.block import Block
 
 RULE_FUNCS = (*r1.RULES, *r2.RULES, *r3.RULES)
 
+# number of times in a row a rule has to leave a line unchanged to be skipped
+# by the adaptive scheduling
+_ADAPTIVE_PATIENCE = 2
 
-def linesolve(raster):
+# default number of probes (see probe) each time probing is started
+_PROBING_BUDGET = 1000
+
+# line solver engines
+ENGINE_RULES = "rules"
+ENGINE_DP = "dp"
+ENGINE_AUTOMATON = "automaton"
+ENGINES = {
+    ENGINE_RULES: RULE_FUNCS,
+    ENGINE_DP: dp.RULES,
+    ENGINE_AUTOMATON: automaton.RULES,
+}
+# engines whose result doesn't depend on the ranges of the blocks
+_RANGE_FREE_ENGINES = (dp.RULES, automaton.RULES)
+
+# the lines having trivial cues are solved in closed form by any of the engines
+SHAPE_PIPELINES = {
+    line.SHAPE_EMPTY: (closed.solve_empty,),
+    line.SHAPE_FULL: (closed.solve_full,),
+    line.SHAPE_SINGLE: (closed.solve_single,),
+}
+# the complete engine tabulating the lines of the LineTable
+_TABLE_ENGINE = automaton.RULES
+
+# line propagation strategies
+PROPAGATION_SWEEP = "sweep"
+PROPAGATION_QUEUE = "queue"
+PROPAGATION_PRIORITY = "priority"
+PROPAGATIONS = (PROPAGATION_SWEEP, PROPAGATION_QUEUE, PROPAGATION_PRIORITY)
+
+# when the lines are checked against their cues: the ranges of the blocks are
+# always checked after each rule (the rules index the line by them), the
+# number of cells and black runs after each rule, once per solved line or not
+# at all. The solved raster is verified against all the cues anyway.
+CHECKS_RULE = "rule"
+CHECKS_LINE = "line"
+CHECKS_FINAL = "final"
+CHECKS = (CHECKS_RULE, CHECKS_LINE, CHECKS_FINAL)
+
+# search strategies if the logical elimination doesn't solve the puzzle: depth
+# first search of arbitrary depth rolling back the guesses by an undo trail
+# or bifurcation up to a given depth copying the raster per guess (the trace
+# of the search is written only by the latter)
+SEARCH_DFS = "dfs"
+SEARCH_BIFURCATE = "bifurcate"
+SEARCHES = (SEARCH_DFS, SEARCH_BIFURCATE)
+
+
+@dataclasses.dataclass
+class Options:
+    """
+    Class holding the knobs of the solving process.
+    """
+
+    # pylint: disable=too-few-public-methods
+    propagation: str = PROPAGATION_QUEUE
+    engine: str = ENGINE_RULES
+    # results of solving the lines, shared by the guessed rasters
+    cache: typing.Optional[LineCache] = None
+    # statistics of the rules, not collected if None
+    profile: typing.Optional[RuleProfile] = None
+    # skip the rules that didn't change a line recently
+    adaptive: bool = False
+    # apply the rules on a line repeatedly until it doesn't change before
+    # updating the raster
+    local_fixpoint: bool = False
+    # solve the lines having trivial cues in closed form (see SHAPE_PIPELINES)
+    shape_pipelines: bool = True
+    # solve the segments of a line between WHITE cells separately once the
+    # range of each block is within one of them (see _split_line)
+    segments: bool = False
+    # complete the lines the rules of the paper (the "rules" engine) stall on
+    # by the lookahead rule (see r4)
+    lookahead: bool = False
+    # see CHECKS_*
+    checks: str = CHECKS_RULE
+    # narrow the ranges of the blocks by packing them before the propagation
+    packing: bool = True
+    # results of solving the short lines completely, persisted across the
+    # runs (not used while tracing either)
+    table: typing.Optional[LineTable] = None
+    # structured trace of the rules and the guesses, not written if None. The
+    # cache is not used while tracing (the rules aren't applied on a hit).
+    trace: typing.Optional[Tracer] = None
+    # see SEARCH_*
+    search: str = SEARCH_DFS
+    # the changes of the raster are recorded to it if it's set (by search)
+    trail: typing.Optional[Trail] = None
+    # number of probes (see probe) before the search and at each guess of the
+    # depth first search, 0 disables probing
+    probing: int = _PROBING_BUDGET
+
+
+class _Monitors:
+    """
+    Observes the rules by several monitors (see RuleProfile.measure).
+    """
+
+    # pylint: disable=too-few-public-methods
+    def __init__(self, *monitors):
+        self.monitors = monitors
+
+    @contextlib.contextmanager
+    def measure(self, func, mask, meta):
+        """Context manager entering the measure of each monitor."""
+        with contextlib.ExitStack() as stack:
+            for monitor in self.monitors:
+                stack.enter_context(monitor.measure(func, mask, meta))
+            yield
+
+
+def linesolve(raster, opts=None, dirty=None):
     """Does a rule based elimination on the raster object and returns a
-    solution (object) if there's any and None otherwise."""
+    solution (object) if there's any and None otherwise. If the dirty lines
+    are given (eg. the ones crossing a guessed cell), the propagation starts
+    from them instead of every line (except the sweep propagation)."""
+    if opts is None:
+        opts = Options()
+
+    scheduler = RuleScheduler(_ADAPTIVE_PATIENCE) if opts.adaptive else None
+    if opts.trace is not None:
+        opts.trace.begin(raster)
+
+    if opts.propagation == PROPAGATION_SWEEP:
+        _linesolve_sweep(raster, opts, scheduler)
+    elif opts.propagation == PROPAGATION_PRIORITY:
+        _linesolve_priority(raster, opts, scheduler, dirty)
+    else:
+        _linesolve_queue(raster, opts, scheduler, dirty)
+
+    if raster.is_solved():
+        verify_solved(raster)
+        return Solution(raster.table)
+
+    return None
+
+
+def verify_solved(raster):
+    """Raises DiscrepancyInModel if the black runs of a row or column of the
+    solved raster differ from its cues."""
+    lines = (
+        *((raster.get_row(meta.idx), meta) for meta in raster.row_meta),
+        *((raster.get_col(meta.idx), meta) for meta in raster.col_meta),
+    )
+    for mask, meta in lines:
+        runs = [len(run) for run in mask.split(bytes([rstr.WHITE])) if run]
+        if runs != [block.length for block in meta.blocks if block.length > 0]:
+            raise DiscrepancyInModel(
+                "the solution contradicts the cues: '{}', meta: {}".format(
+                    mask.decode("ascii"), meta
+                )
+            )
+
+
+def _linesolve_sweep(raster, opts, scheduler=None):
+    """Runs the rules on every row and column until none of the cells or the
+    meta data changes in a full pass."""
     cells_changed = True
     while cells_changed:
         cells_changed = False
-        for meta in raster.row_meta:
-            mask = raster.get_row(meta.idx)
-            orig_meta = copy.deepcopy(meta)
+        for meta in (*raster.row_meta, *raster.col_meta):
+            modified_cells, meta_changed = _solve_line(raster, meta, opts, scheduler)
+            if modified_cells or meta_changed:
+                cells_changed = True
 
-            linesolve_inner(mask, meta)
+        # apply all the rules on the lines where some of them were skipped
+        if not cells_changed and scheduler is not None:
+            cells_changed = bool(scheduler.take_unverified())
 
-            if raster.update_row(mask=mask, idx=meta.idx) or meta != orig_meta:
-                cells_changed = True
-            logging.debug("%s", raster)
 
-        for meta in raster.col_meta:
-            mask = raster.get_col(meta.idx)
-            orig_meta = copy.deepcopy(meta)
+def _linesolve_queue(raster, opts, scheduler=None, dirty=None):
+    """Runs the rules only on the "dirty" lines: initially every line is
+    dirty (unless they are given), later only the lines crossing a modified
+    cell and the lines whose meta data changed are (re)enqueued."""
+    lines = (raster.col_meta, raster.row_meta)
+    if dirty is None:
+        dirty = (*raster.row_meta, *raster.col_meta)
+    # pending[is_row][idx] is set if the line is in the queue
+    pending = (bytearray(raster.width), bytearray(raster.height))
+    for meta in dirty:
+        pending[meta.is_row][meta.idx] = 1
+    queue = collections.deque(dirty)
 
-            linesolve_inner(mask, meta)
+    while queue or _requeue_unverified(scheduler, pending, queue.append):
+        meta = queue.popleft()
+        pending[meta.is_row][meta.idx] = 0
 
-            if raster.update_col(mask=mask, idx=meta.idx) or meta != orig_meta:
-                cells_changed = True
-            logging.debug("%s", raster)
+        modified_cells, meta_changed = _solve_line(raster, meta, opts, scheduler)
 
-    if raster.is_solved():
-        return Solution(raster.table)
+        # the crossing lines of the modified cells
+        crossing = lines[not meta.is_row]
+        crossing_pending = pending[not meta.is_row]
+        for cell_idx in modified_cells:
+            if not crossing_pending[cell_idx]:
+                crossing_pending[cell_idx] = 1
+                queue.append(crossing[cell_idx])
 
-    return None
+        # the line itself may not be at a fixpoint yet
+        if (modified_cells or meta_changed) and not pending[meta.is_row][meta.idx]:
+            pending[meta.is_row][meta.idx] = 1
+            queue.append(meta)
 
 
-def linesolve_inner(mask, meta):
-    """Rule based elimination on the received parameters."""
-    nblack, nwhite = meta.nums
+def _requeue_unverified(scheduler, pending, enqueue):
+    """Enqueue the lines where some of the rules were skipped by the scheduler
+    (if there's any). Returns whether there was any such line."""
+    if scheduler is None:
+        return False
 
-    for func in RULE_FUNCS:
-        func(mask, meta)
-        for block in meta.blocks:
-            u = (block.end - block.start + 1) - block.length
-            # assert u >= 0, "u: " + str(u) + " blk: " + str(block) + " meta: " + str(meta)
-            # assert block.start >= 0, "block.start < 0, blk: " + str(block)
-            # assert block.end < meta.size, "block ends outside of the boundary, blk: " + str(block)
-            if u < 0:
-                raise DiscrepancyInModel(
-                    "u: " + str(u) + " blk: " + str(block) + " meta: " + str(meta)
-                )
+    lines = scheduler.take_unverified()
+    for meta in lines:
+        if not pending[meta.is_row][meta.idx]:
+            pending[meta.is_row][meta.idx] = 1
+            enqueue(meta)
+
+    return bool(lines)
+
+
+def _line_priority(meta, unknowns, touched):
+    """Returns the expected payoff of running the rules on a line.
+
+    The more crossing cells have been fixed since the line was last solved
+    relative to its UNKNOWN cells and to the room its blocks have to move, the
+    more likely the rules fix new cells. Lines without UNKNOWN cells are
+    checked first as they are cheap and reveal a discrepancy right away.
+    """
+    if not unknowns:
+        return float("inf")
 
-            if block.start < 0:
-                raise DiscrepancyInModel("block.start < 0, meta: " + str(meta))
+    slack = sum(block.end - block.start + 1 - block.length for block in meta.blocks)
+    return (touched + 1) / (unknowns + slack)
 
-            if block.end >= meta.size:
+
+def _linesolve_priority(raster, opts, scheduler=None, dirty=None):
+    """Runs the rules on the dirty lines (see _linesolve_queue) but always
+    picks the line with the highest expected payoff next."""
+    lines = (raster.col_meta, raster.row_meta)
+    # number of cells fixed by crossing lines since the line was last solved
+    touched = ([0] * raster.width, [0] * raster.height)
+    if dirty is None:
+        dirty = (*raster.row_meta, *raster.col_meta)
+    pending = (bytearray(raster.width), bytearray(raster.height))
+    for meta in dirty:
+        pending[meta.is_row][meta.idx] = 1
+    # heap of (-priority, sequence number, meta); a line can have stale entries
+    # in the heap, those are skipped if the line is not pending anymore
+    heap = []
+    seq = itertools.count()
+
+    def push(meta):
+        meta = lines[meta.is_row][meta.idx]
+        prio = _line_priority(
+            meta,
+            raster.unknown_cnt(meta.is_row, meta.idx),
+            touched[meta.is_row][meta.idx],
+        )
+        heapq.heappush(heap, (-prio, next(seq), meta))
+
+    for meta in dirty:
+        push(meta)
+
+    while heap or _requeue_unverified(scheduler, pending, push):
+        _, _, meta = heapq.heappop(heap)
+        if not pending[meta.is_row][meta.idx]:
+            continue
+        pending[meta.is_row][meta.idx] = 0
+        touched[meta.is_row][meta.idx] = 0
+
+        modified_cells, meta_changed = _solve_line(raster, meta, opts, scheduler)
+
+        crossing = lines[not meta.is_row]
+        for cell_idx in modified_cells:
+            touched[not meta.is_row][cell_idx] += 1
+            pending[not meta.is_row][cell_idx] = 1
+            push(crossing[cell_idx])
+
+        if modified_cells or meta_changed:
+            pending[meta.is_row][meta.idx] = 1
+            push(meta)
+
+
+def _solve_line(raster, meta, opts, scheduler=None):
+    """Rule based elimination on a single line of the raster. Returns the
+    indices of the modified cells and whether the meta data of the line has
+    changed."""
+    # the line may have been replaced by a new version since it was enqueued
+    if meta.is_row:
+        meta = raster.row_meta[meta.idx]
+        mask = raster.get_row(meta.idx)
+    else:
+        meta = raster.col_meta[meta.idx]
+        mask = raster.get_col(meta.idx)
+    orig_ranges = meta.ranges()
+    check = _check_line if opts.checks == CHECKS_RULE else _check_ranges
+    monitor = _monitor(opts)
+
+    modified_cells = []
+    try:
+        segments = None
+        if opts.segments and scheduler is None and opts.trace is None:
+            segments = _split_line(mask, meta, opts)
+        if segments is None:
+            complete = _solve_mask(mask, meta, opts, scheduler, monitor, check)
+        else:
+            complete = _solve_segments(mask, meta, segments, opts, monitor, check)
+        if scheduler is not None:
+            scheduler.done(meta, complete)
+        if opts.checks == CHECKS_LINE:
+            _check_counts(mask, meta)
+
+        if meta.is_row:
+            modified_cells = raster.update_row(mask=mask, idx=meta.idx)
+        else:
+            modified_cells = raster.update_col(mask=mask, idx=meta.idx)
+        logging.debug("%s", raster)
+    finally:
+        # the rules narrow the ranges even if they end up in a discrepancy
+        old_meta = meta
+        meta = _commit_ranges(raster, meta, orig_ranges)
+        if opts.trail is not None:
+            opts.trail.record(
+                meta, old_meta if meta is not old_meta else None, modified_cells
+            )
+
+    return modified_cells, meta.ranges() != orig_ranges
+
+
+def _commit_ranges(raster, meta, orig_ranges):
+    """The rules narrow the ranges of the line in place: if they've changed,
+    restore them and replace the line with a new version (the meta data is
+    persistent, see Raster.set_line). Returns the current version."""
+    ranges = meta.ranges()
+    if ranges == orig_ranges:
+        return meta
+
+    meta.set_ranges(orig_ranges)
+    meta = meta.with_ranges(ranges)
+    raster.set_line(meta)
+    return meta
+
+
+def _solve_mask(mask, meta, opts, scheduler, monitor, check):
+    """Applies the rules of the line (see pipeline) on the mask, through the
+    line table or the line cache if there's any. Returns whether all the rules
+    were applied."""
+    rule_funcs = pipeline(meta, opts)
+    # the other engines are complete
+    lookahead = r4.RULES if opts.lookahead and rule_funcs is RULE_FUNCS else ()
+    key = None
+    if opts.table is not None and opts.trace is None:
+        key = opts.table.key(mask, meta)
+
+    if key is not None:
+        complete = _tabulated_linesolve_inner(
+            mask, meta, opts.table, key, monitor, check
+        )
+    elif opts.cache is None or opts.trace is not None:
+        complete = linesolve_inner(
+            mask,
+            meta,
+            rule_funcs,
+            monitor,
+            scheduler,
+            opts.local_fixpoint,
+            check,
+            lookahead,
+        )
+    else:
+        complete = _cached_linesolve_inner(
+            mask,
+            meta,
+            rule_funcs,
+            opts.cache,
+            monitor,
+            scheduler,
+            opts.local_fixpoint,
+            check,
+            lookahead,
+        )
+
+    return complete
+
+
+def _split_line(mask, meta, opts):
+    """Returns the (start, end, blocks) triples of the segments of the line
+    delimited by WHITE cells and the blocks whose range is within them, or
+    None if the range of a block spans a WHITE cell (or the line is solved in
+    closed form or has a single segment). The segments of such a line are
+    independent lines."""
+    if pipeline(meta, opts) is not ENGINES[opts.engine]:
+        return None
+    runs = r._get_non_white_runs(mask)
+    if len(runs) < 2:
+        return None
+
+    segments = [(run.start, run.end, []) for run in runs]
+    seg_idx = 0
+    for block in meta.blocks:
+        while seg_idx < len(runs) and runs[seg_idx].end < block.start:
+            seg_idx += 1
+        if (
+            seg_idx == len(runs)
+            or block.start < runs[seg_idx].start
+            or block.end > runs[seg_idx].end
+        ):
+            return None
+        segments[seg_idx][2].append(block)
+
+    return segments
+
+
+def _solve_segments(mask, meta, segments, opts, monitor, check):
+    """Solves the segments (see _split_line) as separate lines, except the
+    settled ones: a segment without UNKNOWN cells is a single block. Returns
+    True (the scheduler isn't used)."""
+    for start, end, blocks in segments:
+        size = end - start + 1
+        if rstr.UNKNOWN not in mask[start : end + 1] and len(blocks) == 1:
+            if blocks[0].length != size:
                 raise DiscrepancyInModel(
-                    "block ends outside of the boundary, meta: " + str(meta)
+                    "segment [{}, {}] isn't {}, meta: {}".format(
+                        start, end, blocks[0], meta
+                    )
                 )
+            blocks[0].start, blocks[0].end = start, end
+            continue
+
+        sub_mask = mask[start : end + 1]
+        sub_meta = type(meta)(
+            size,
+            meta.idx,
+            [Block(blk.start - start, blk.end - start, blk.length) for blk in blocks]
+            or [Block(0, size - 1, 0)],
+        )
+        _solve_mask(sub_mask, sub_meta, opts, None, monitor, check)
+        mask[start : end + 1] = sub_mask
+        for block, sub_block in zip(blocks, sub_meta.blocks):
+            block.start = sub_block.start + start
+            block.end = sub_block.end + start
+
+    check(mask, meta)
+    return True
+
+
+def _monitor(opts):
+    """Returns the object observing the rules (see RuleProfile.measure) or
+    None."""
+    if opts.trace is None:
+        return opts.profile
+    if opts.profile is None:
+        return opts.trace
+
+    return _Monitors(opts.profile, opts.trace)
+
+
+def pipeline(meta, opts):
+    """Returns the rules to be applied on the line."""
+    if opts.shape_pipelines and meta.shape in SHAPE_PIPELINES:
+        return SHAPE_PIPELINES[meta.shape]
+
+    return ENGINES[opts.engine]
+
+
+def _cached_linesolve_inner(
+    mask,
+    meta,
+    rule_funcs,
+    cache,
+    profile=None,
+    scheduler=None,
+    fixpoint=False,
+    check=None,
+    lookahead=(),
+):
+    """Like linesolve_inner but looks up the result in the cache first and
+    stores it there if it's not found (and all the rules were applied)."""
+    if rule_funcs in _RANGE_FREE_ENGINES:
+        clue = tuple(block.length for block in meta.blocks)
+    else:
+        # the result of the rules depends on the ranges of the blocks too
+        clue = tuple((block.start, block.end, block.length) for block in meta.blocks)
+    key = (rule_funcs, fixpoint, check, lookahead, clue, bytes(mask))
+
+    entry = cache.get(key)
+    if entry is None:
+        try:
+            complete = linesolve_inner(
+                mask, meta, rule_funcs, profile, scheduler, fixpoint, check, lookahead
+            )
+        except DiscrepancyInModel as e:
+            cache.put(key, str(e))
+            raise
+
+        if complete:
+            cache.put(key, (bytes(mask), tuple(meta.ranges())))
+        return complete
+
+    if isinstance(entry, str):
+        raise DiscrepancyInModel(entry)
+
+    new_mask, ranges = entry
+    mask[:] = new_mask
+    meta.set_ranges(ranges)
+
+    return True
 
-        cblack, cwhite = rstr.filled_cnt(mask)
-        # if more cells are colored to black or white than it should...
-        if cblack > nblack or cwhite > nwhite:
+
+def _tabulated_linesolve_inner(mask, meta, table, key, profile=None, check=None):
+    """Solves the line by looking up the result in the table. If it's not
+    found, the line is solved by the closed form solvers or the complete
+    engine from the full width ranges of the blocks (so that the result
+    depends only on the key) and the result is stored in the table."""
+    entry = table.get(key)
+    if entry is None:
+        new_mask = bytearray(mask)
+        new_meta = copy.deepcopy(meta)
+        new_meta.set_ranges([(0, meta.size - 1)] * len(meta.blocks))
+        rule_funcs = SHAPE_PIPELINES.get(meta.shape, _TABLE_ENGINE)
+        try:
+            linesolve_inner(new_mask, new_meta, rule_funcs, profile, check=check)
+        except DiscrepancyInModel as e:
+            entry = str(e)
+        else:
+            entry = (bytes(new_mask), tuple(new_meta.ranges()))
+        table.put(key, entry)
+
+    if isinstance(entry, str):
+        raise DiscrepancyInModel(entry)
+
+    new_mask, ranges = entry
+    mask[:] = new_mask
+    meta.set_ranges(ranges)
+
+    return True
+
+
+def linesolve_inner(
+    mask,
+    meta,
+    rule_funcs=RULE_FUNCS,
+    profile=None,
+    scheduler=None,
+    fixpoint=False,
+    check=None,
+    lookahead=(),
+):
+    """Rule based elimination on the received parameters. If fixpoint is set,
+    the rules are applied repeatedly until the line doesn't change anymore.
+    The lookahead rules (see r4) are applied only if the rules didn't change
+    the line but it has UNKNOWN cells. The line is checked by the check
+    function (_check_line by default) after each rule. Returns False if the
+    scheduler skipped some of the rules (in the last round) and True
+    otherwise."""
+    if check is None:
+        check = _check_line
+    if lookahead:
+        orig = _line_state(mask, meta)
+
+    if not fixpoint:
+        complete = _linesolve_round(mask, meta, rule_funcs, profile, scheduler, check)
+    else:
+        while True:
+            state = _line_state(mask, meta)
+            complete = _linesolve_round(
+                mask, meta, rule_funcs, profile, scheduler, check
+            )
+            if state == _line_state(mask, meta):
+                break
+
+    if lookahead and rstr.UNKNOWN in mask and orig == _line_state(mask, meta):
+        for func in lookahead:
+            _apply_rule(func, mask, meta, profile, check)
+
+    return complete
+
+
+def _line_state(mask, meta):
+    """Returns the cells and the block ranges of the line."""
+    return bytes(mask), meta.ranges()
+
+
+def _linesolve_round(mask, meta, rule_funcs, profile, scheduler, check):
+    """Applies each rule (not skipped by the scheduler) once on the line.
+    Returns whether none of the rules was skipped."""
+    if scheduler is None:
+        for func in rule_funcs:
+            _apply_rule(func, mask, meta, profile, check)
+
+        return True
+
+    complete = True
+    for rule_idx, func in enumerate(rule_funcs):
+        if scheduler.skip(meta, rule_idx):
+            complete = False
+            continue
+
+        orig = _line_state(mask, meta)
+        _apply_rule(func, mask, meta, profile, check)
+        changed = orig != _line_state(mask, meta)
+        scheduler.record(meta, rule_idx, len(rule_funcs), changed)
+
+    return complete
+
+
+def _apply_rule(func, mask, meta, profile, check):
+    """Applies the rule on the line and checks the result."""
+    if profile is None:
+        func(mask, meta)
+        check(mask, meta)
+    else:
+        with profile.measure(func, mask, meta):
+            func(mask, meta)
+            check(mask, meta)
+
+
+def _check_line(mask, meta):
+    """Raises DiscrepancyInModel if the mask or the meta data of the line
+    contradicts the cues."""
+    _check_ranges(mask, meta)
+    _check_counts(mask, meta)
+
+
+def _check_ranges(_, meta):
+    """Raises DiscrepancyInModel if the range of a block is out of the line or
+    too short for the block."""
+    for block in meta.blocks:
+        u = (block.end - block.start + 1) - block.length
+        # assert u >= 0, "u: " + str(u) + " blk: " + str(block) + " meta: " + str(meta)
+        # assert block.start >= 0, "block.start < 0, blk: " + str(block)
+        # assert block.end < meta.size, "block ends outside of the boundary, blk: " + str(block)
+        if u < 0:
             raise DiscrepancyInModel(
-                "nblack: {}, actually colored: {}, nwhite: {}, actually colored {}, meta: {}".format(
-                    nblack, cblack, nwhite, cwhite, meta
-                )
+                "u: " + str(u) + " blk: " + str(block) + " meta: " + str(meta)
             )
 
-        # if the line is "solved" (although UNKNOWN cells can still appear)
-        if cblack == nblack:
-            black_runs = r._get_black_runs(mask)
-            # then there should be exactly as many black runs as the meta says
-            if len(black_runs) != len([b for b in meta.blocks if b.length > 0]):
-                raise DiscrepancyInModel(
-                    "len(black_runs) != len(meta.blocks):  {} != {} mask: '{}', meta: {}".format(
-                        len(black_runs), len(meta.blocks), mask.decode("ascii"), meta
-                    )
+        if block.start < 0:
+            raise DiscrepancyInModel("block.start < 0, meta: " + str(meta))
+
+        if block.end >= meta.size:
+            raise DiscrepancyInModel(
+                "block ends outside of the boundary, meta: " + str(meta)
+            )
+
+
+def _check_counts(mask, meta):
+    """Raises DiscrepancyInModel if more cells of the line are colored than
+    the cues allow or all the black cells are colored but the number of the
+    black runs differs from the number of the blocks."""
+    nblack, nwhite = meta.nums
+    cblack, cwhite = rstr.filled_cnt(mask)
+    # if more cells are colored to black or white than it should...
+    if cblack > nblack or cwhite > nwhite:
+        raise DiscrepancyInModel(
+            "nblack: {}, actually colored: {}, nwhite: {}, actually colored {}, meta: {}".format(
+                nblack, cblack, nwhite, cwhite, meta
+            )
+        )
+
+    # if the line is "solved" (although UNKNOWN cells can still appear)
+    if cblack == nblack:
+        black_runs = r._get_black_runs(mask)
+        # then there should be exactly as many black runs as the meta says
+        if len(black_runs) != len([b for b in meta.blocks if b.length > 0]):
+            raise DiscrepancyInModel(
+                "len(black_runs) != len(meta.blocks):  {} != {} mask: '{}', meta: {}".format(
+                    len(black_runs), len(meta.blocks), mask.decode("ascii"), meta
                 )
+            )
 
 
-def bifurcate(raster, level, print_raster=False):
+def bifurcate(raster, level, print_raster=False, opts=None):
     """Makes a guess, applies logical elimination and backtracks if discrepancy
     found."""
+    if opts is None:
+        opts = Options()
+
     for guess in raster.rank_guess_opts():
         _, _, idx = guess
         for guessed_raster in raster.make_guess(idx):
             if print_raster:
                 logging.debug("%s", guessed_raster)
+            if opts.trace is not None:
+                opts.trace.guess(raster, guessed_raster)
             try:
-                solution = linesolve(guessed_raster)
+                solution = linesolve(guessed_raster, opts)
             except DiscrepancyInModel as e:
+                if opts.trace is not None:
+                    opts.trace.discrepancy(guessed_raster, str(e))
                 logging.debug("Discrepancy detected while bifurcating: %s", e)
                 logging.debug("%s", guessed_raster)
                 # this guess lead to a failure. try the next guess
@@ -120,7 +742,7 @@ def bifurcate(raster, level, print_raster=False):
 
             # TODO: not solved and no discrepancy found then branch further
             if level > 0:
-                solution = bifurcate(guessed_raster, level - 1)
+                solution = bifurcate(guessed_raster, level - 1, opts=opts)
 
                 if solution:
                     return solution
@@ -128,17 +750,245 @@ def bifurcate(raster, level, print_raster=False):
     return None
 
 
-def solve(raster, no_bifurcation, blvl):
-    """Performs logical elimination and continues with bifurcation if needed.  Returns
-    a solution (object) if there's any and None otherwise."""
-    solution = linesolve(raster)
+def search(raster, opts=None):
+    """Depth first search of arbitrary depth: colors an UNKNOWN cell, applies
+    logical elimination and tries the other color if it ends in discrepancy,
+    backtracking if neither of them works. The changes are rolled back by an
+    undo trail instead of copying the raster per guess. Returns a solution
+    (object) if there's any and None otherwise."""
+    opts = dataclasses.replace(opts or Options(), trail=Trail())
+    trail = opts.trail
+    # the mark of the trail and the untried guesses of each level
+    stack = [(trail.mark(), _guesses(raster))]
+    while stack:
+        mark, guesses = stack[-1]
+        trail.undo(raster, mark)
+        if not guesses:
+            stack.pop()
+            continue
+
+        row_idx, col_idx, color = guesses.pop()
+        raster.set_cell(row_idx, col_idx, color)
+        trail.record(raster.row_meta[row_idx], cells=(col_idx,))
+        logging.debug("Guess at depth %d: %d, %d", len(stack), row_idx, col_idx)
+        try:
+            solution = linesolve(
+                raster, opts, dirty=(raster.row_meta[row_idx], raster.col_meta[col_idx])
+            )
+            if not solution and opts.probing:
+                solution = probe(raster, opts)
+        except DiscrepancyInModel as e:
+            logging.debug("Discrepancy detected while searching: %s", e)
+            continue
+
+        if solution:
+            return solution
+
+        stack.append((trail.mark(), _guesses(raster)))
+
+    return None
+
+
+def probe(raster, opts=None, budget=None):
+    """Colors an UNKNOWN cell BLACK and WHITE in turn and applies logical
+    elimination on both (rolled back by the trail). A color ending in
+    discrepancy is eliminated and the cells colored the same way by both are
+    committed. The cells crossing the lines changed by the last commit are
+    probed first, until a pass doesn't commit anything or the budget (the
+    number of probes, opts.probing by default) runs out. Returns a solution
+    (object) if there's any and None otherwise, raises DiscrepancyInModel if
+    neither color of a cell is possible."""
+    if opts is None:
+        opts = Options()
+    if budget is None:
+        budget = opts.probing
+    if opts.trail is None:
+        opts = dataclasses.replace(opts, trail=Trail())
+
+    recent = (set(), set())
+    while budget > 0:
+        for row_idx, col_idx in _probe_cells(raster, recent):
+            if budget <= 0:
+                return None
+            if raster.get_row(row_idx)[col_idx] != rstr.UNKNOWN:
+                continue
+
+            outcomes = []
+            for color in (rstr.BLACK, rstr.WHITE):
+                budget -= 1
+                solution, outcome = _probe_color(raster, opts, row_idx, col_idx, color)
+                if solution:
+                    return solution
+                outcomes.append(outcome)
+
+            forced = _forced_cells(row_idx, col_idx, *outcomes)
+            if forced:
+                logging.debug(
+                    "Probing %d, %d forced %d cells", row_idx, col_idx, len(forced)
+                )
+                solution = _commit_cells(raster, opts, forced)
+                if solution:
+                    return solution
+                # the cells near the changes are probed first
+                recent = ({col for _, col in forced}, {row for row, _ in forced})
+                break
+        else:
+            return None
+
+    return None
+
+
+def _probe_cells(raster, recent):
+    """Returns the positions of the UNKNOWN cells, the ones on the recent
+    (columns, rows) first, then those having fewer UNKNOWN crossing cells."""
+    cols, rows = recent
+    cells = [
+        (row_idx, col_idx)
+        for row_idx in range(raster.height)
+        for col_idx, cell in enumerate(raster.get_row(row_idx))
+        if cell == rstr.UNKNOWN
+    ]
+    cells.sort(
+        key=lambda pos: (
+            -((pos[0] in rows) + (pos[1] in cols)),
+            raster.unknown_cnt(True, pos[0]) + raster.unknown_cnt(False, pos[1]),
+        )
+    )
+    return cells
+
+
+def _probe_color(raster, opts, row_idx, col_idx, color):
+    """Colors the cell and applies logical elimination from its lines. Returns
+    the solution if it's solved (the changes are kept then) or the colors of
+    the cells colored (None if it ends in discrepancy) and rolls back the
+    changes."""
+    trail = opts.trail
+    mark = trail.mark()
+    raster.set_cell(row_idx, col_idx, color)
+    trail.record(raster.row_meta[row_idx], cells=(col_idx,))
+    try:
+        solution = linesolve(
+            raster, opts, dirty=(raster.row_meta[row_idx], raster.col_meta[col_idx])
+        )
+    except DiscrepancyInModel as e:
+        logging.debug("Discrepancy detected while probing: %s", e)
+        trail.undo(raster, mark)
+        return None, None
+
+    if solution:
+        return solution, None
+
+    colored = {pos: raster.get_row(pos[0])[pos[1]] for pos in trail.colored_since(mark)}
+    trail.undo(raster, mark)
+    return None, colored
+
+
+def _forced_cells(row_idx, col_idx, black, white):
+    """Returns the colors of the cells forced by the outcomes of probing the
+    cell (see _probe_color)."""
+    if black is None and white is None:
+        raise DiscrepancyInModel(
+            "probing: neither color of ({}, {}) is possible".format(row_idx, col_idx)
+        )
+    if black is None:
+        return {(row_idx, col_idx): rstr.WHITE}
+    if white is None:
+        return {(row_idx, col_idx): rstr.BLACK}
+
+    return {pos: color for pos, color in black.items() if white.get(pos) == color}
+
+
+def _commit_cells(raster, opts, cells):
+    """Colors the cells and applies logical elimination from their lines.
+    Returns a solution (object) if there's any and None otherwise."""
+    dirty = {}
+    for (row_idx, col_idx), color in cells.items():
+        raster.set_cell(row_idx, col_idx, color)
+        opts.trail.record(raster.row_meta[row_idx], cells=(col_idx,))
+        dirty[True, row_idx] = raster.row_meta[row_idx]
+        dirty[False, col_idx] = raster.col_meta[col_idx]
+
+    return linesolve(raster, opts, dirty=list(dirty.values()))
+
+
+def _guesses(raster):
+    """Returns the (row index, column index, color) triples of the guesses of
+    the first UNKNOWN cell of the best ranked row (see rank_guess_opts), in
+    reverse order of trial."""
+    ranked = raster.rank_guess_opts()
+    if not ranked:
+        return []
+
+    _, _, idx = ranked[0]
+    col_idx = raster.get_row(idx).index(rstr.UNKNOWN)
+    nblack, nwhite = raster.row_meta[idx].nums
+    cblack, cwhite = raster.filled_cnt(True, idx)
+
+    guesses = []
+    if cwhite < nwhite:
+        guesses.append((idx, col_idx, rstr.WHITE))
+    if cblack < nblack:
+        guesses.append((idx, col_idx, rstr.BLACK))
+    return guesses
+
+
+def pack(raster, opts=None):
+    """Narrows the ranges of the blocks of every line to their leftmost and
+    rightmost packing and colors the cells covered by both."""
+    if opts is None:
+        opts = Options()
+    if opts.trace is not None:
+        opts.trace.begin(raster)
+
+    for meta in (*raster.row_meta, *raster.col_meta):
+        if meta.is_row:
+            mask = raster.get_row(meta.idx)
+        else:
+            mask = raster.get_col(meta.idx)
+
+        orig_ranges = meta.ranges()
+        try:
+            linesolve_inner(mask, meta, packing.RULES, _monitor(opts))
+        finally:
+            _commit_ranges(raster, meta, orig_ranges)
+
+        if meta.is_row:
+            raster.update_row(mask=mask, idx=meta.idx)
+        else:
+            raster.update_col(mask=mask, idx=meta.idx)
+
+
+def solve(raster, no_bifurcation=False, blvl=1, opts=None):
+    """Performs logical elimination and continues with the search if needed.
+    Returns a solution (object) if there's any and None otherwise."""
+    if opts is None:
+        opts = Options()
+    if opts.packing:
+        pack(raster, opts)
+
+    solution = linesolve(raster, opts)
 
     if solution:
         return solution
 
+    # probing colors the cells tentatively, so it's a kind of guessing too
+    if opts.probing and opts.trace is None and not no_bifurcation:
+        logging.info("No solution after pure logical elimination. Probing...\n")
+        try:
+            solution = probe(raster, opts)
+        except DiscrepancyInModel as e:
+            logging.debug("Discrepancy detected while probing: %s", e)
+            return None
+        if solution:
+            return solution
+
     if no_bifurcation:
         logging.info("%s", raster)
         sys.exit(1)
 
+    if opts.search == SEARCH_DFS and opts.trace is None:
+        logging.info("No solution after pure logical elimination. Searching...\n")
+        return search(raster, opts)
+
     logging.info("No solution after pure logical elimination. Bifurcating...\n")
-    return bifurcate(raster, blvl)
+    return bifurcate(raster, blvl, opts=opts)
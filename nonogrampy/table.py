@@ -0,0 +1,211 @@
+"""
+Persistent table of the results of solving the short lines.
+
+The table maps the (clue, mask) pairs of the lines not longer than its
+max_length to the result of solving them completely: the new mask and block
+ranges or a discrepancy. The entries are tabulated lazily by the solver and
+saved to a data file of fixed size records sorted by their key, which is
+searched through mmap when loaded, so the file isn't read as a whole.
+
+File format (little endian):
+
+- header: magic (4 bytes), max_length (uint16), number of records (uint32)
+- records: key, value
+
+key: size of the line (1 byte), the lengths of the blocks (max_length + 1) // 2
+bytes padded with zeros, the cells of the mask (2 bits per cell, big endian).
+value: status (1 byte, 0: solved, 1: discrepancy), the cells of the new mask
+and the start and the end of each block (1 byte each, padded with zeros).
+"""
+
+import mmap
+import os
+import struct
+
+from nonogrampy.raster import BLACK
+from nonogrampy.raster import UNKNOWN
+from nonogrampy.raster import WHITE
+
+# bumped whenever the solved lines may differ from the ones of the older tables
+_MAGIC = b"NLT2"
+_HEADER = struct.Struct("<4sHI")
+
+# the biggest max_length, the ranges are stored in a byte
+MAX_LENGTH = 255
+
+_STATUS_SOLVED = 0
+_STATUS_DISCREPANCY = 1
+
+# the 2 bits code of the colors as base 4 digits and vice versa
+_TO_DIGITS = bytes.maketrans(bytes([WHITE, BLACK, UNKNOWN]), b"012")
+_CELLS = (WHITE, BLACK, UNKNOWN)
+
+
+def _pack(mask, width):
+    """Return the cells of the mask packed to the given number of bytes."""
+    return int(mask.translate(_TO_DIGITS), 4).to_bytes(width, "big")
+
+
+def _unpack(packed, size):
+    """Return the mask of the given size packed by _pack."""
+    code = int.from_bytes(packed, "big")
+    return bytes(_CELLS[(code >> 2 * (size - 1 - i)) & 3] for i in range(size))
+
+
+class LineTable:
+    """
+    Table of the results of solving the lines, see the module docstring.
+    """
+
+    def __init__(self, max_length):
+        if not 0 < max_length <= MAX_LENGTH:
+            raise ValueError("max_length should be in [1, {}]".format(MAX_LENGTH))
+
+        self.max_length = max_length
+        self.hits = 0
+        self.misses = 0
+        self._nslots = (max_length + 1) // 2
+        self._width = (2 * max_length + 7) // 8
+        self._key_size = 1 + self._nslots + self._width
+        self._record_size = self._key_size + 1 + self._width + 2 * self._nslots
+        # the entries tabulated since the table was loaded
+        self._new = {}
+        self._file = None
+        self._map = None
+        self._nrecords = 0
+
+    @classmethod
+    def load(cls, path):
+        """Return the table saved to the file."""
+        with open(path, "rb") as inp:
+            magic, max_length, nrecords = _HEADER.unpack(inp.read(_HEADER.size))
+        if magic != _MAGIC:
+            raise ValueError("{} is not a line table".format(path))
+
+        table = cls(max_length)
+        table._file = open(path, "rb")
+        table._map = mmap.mmap(table._file.fileno(), 0, access=mmap.ACCESS_READ)
+        table._nrecords = nrecords
+        if len(table._map) != _HEADER.size + nrecords * table._record_size:
+            table.close()
+            raise ValueError("{} is truncated".format(path))
+
+        return table
+
+    def close(self):
+        """Unmap the file the table was loaded from."""
+        if self._map is not None:
+            self._map.close()
+            self._file.close()
+            self._map = self._file = None
+            self._nrecords = 0
+
+    def __len__(self):
+        return self._nrecords + len(self._new)
+
+    def __str__(self):
+        return "size: {}, new: {}, hits: {}, misses: {}".format(
+            len(self), len(self._new), self.hits, self.misses
+        )
+
+    def key(self, mask, meta):
+        """Return the key of the line (the ranges of the blocks aren't part
+        of it) or None if the line is longer than max_length."""
+        if meta.size > self.max_length:
+            return None
+
+        lengths = bytes(block.length for block in meta.blocks)
+        return (
+            bytes((meta.size,))
+            + lengths.ljust(self._nslots, b"\0")
+            + _pack(mask, self._width)
+        )
+
+    def get(self, key):
+        """Return the entry stored for the key or None if there's no such
+        entry. The entry is the message of the discrepancy or the new mask and
+        the ranges of the blocks."""
+        entry = self._new.get(key)
+        if entry is None:
+            value = self._find(key)
+            if value is not None:
+                entry = self._decode(key, value)
+
+        if entry is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return entry
+
+    def put(self, key, entry):
+        """Store the entry (see get) of the key."""
+        self._new[key] = entry
+
+    def _find(self, key):
+        """Binary search of the value of the key among the records of the
+        file."""
+        lo, hi = 0, self._nrecords
+        while lo < hi:
+            mid = (lo + hi) // 2
+            offset = _HEADER.size + mid * self._record_size
+            record_key = self._map[offset : offset + self._key_size]
+            if record_key < key:
+                lo = mid + 1
+            elif record_key > key:
+                hi = mid
+            else:
+                offset += self._key_size
+                return self._map[offset : offset + self._record_size - self._key_size]
+
+        return None
+
+    def _decode(self, key, value):
+        """Return the entry of the record."""
+        size = key[0]
+        if value[0] == _STATUS_DISCREPANCY:
+            return "the line cannot be solved (line table): '{}'".format(
+                _unpack(key[-self._width :], size).decode("ascii")
+            )
+
+        nblocks = max(1, len(key[1 : 1 + self._nslots].rstrip(b"\0")))
+        ranges = value[1 + self._width :]
+        return (
+            _unpack(value[1 : 1 + self._width], size),
+            tuple((ranges[2 * i], ranges[2 * i + 1]) for i in range(nblocks)),
+        )
+
+    def _encode(self, entry):
+        """Return the value of the record of the entry."""
+        if isinstance(entry, str):
+            return bytes((_STATUS_DISCREPANCY,)).ljust(
+                self._record_size - self._key_size, b"\0"
+            )
+
+        mask, ranges = entry
+        value = bytes((_STATUS_SOLVED,)) + _pack(mask, self._width)
+        value += bytes(pos for range_ in ranges for pos in range_)
+        return value.ljust(self._record_size - self._key_size, b"\0")
+
+    def _records(self):
+        """Return the key -> value mapping of all the records."""
+        records = {}
+        for idx in range(self._nrecords):
+            offset = _HEADER.size + idx * self._record_size
+            record = self._map[offset : offset + self._record_size]
+            records[record[: self._key_size]] = record[self._key_size :]
+        for key, entry in self._new.items():
+            records[key] = self._encode(entry)
+
+        return records
+
+    def save(self, path):
+        """Write all the entries to the file (replacing it atomically, so the
+        table loaded from it remains valid)."""
+        records = self._records()
+        tmp_path = "{}.tmp{}".format(path, os.getpid())
+        with open(tmp_path, "wb") as out:
+            out.write(_HEADER.pack(_MAGIC, self.max_length, len(records)))
+            for key in sorted(records):
+                out.write(key)
+                out.write(records[key])
+        os.replace(tmp_path, path)
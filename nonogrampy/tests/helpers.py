@@ -0,0 +1,22 @@
+"""
+Helpers shared by the unit tests.
+"""
+
+import os
+
+from nonogrampy.raster import Raster
+from nonogrampy.raster.block import Block
+from nonogrampy.raster.line import Line
+
+EXAMPLES_DIR = os.path.join(os.path.dirname(__file__), os.pardir, os.pardir, "examples")
+
+
+def load_example(name):
+    """Return the raster of the puzzle in the examples directory."""
+    with open(os.path.join(EXAMPLES_DIR, name), "r") as fh:
+        return Raster.from_file(fh)
+
+
+def new_line(size, lengths):
+    """Return the meta data of a line the blocks of which can be anywhere."""
+    return Line(size, 0, [Block(0, size - 1, length) for length in lengths])
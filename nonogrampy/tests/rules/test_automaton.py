@@ -0,0 +1,53 @@
+#!/usr/bin/env python
+
+import copy
+import itertools
+import unittest
+
+# pylint: disable=wrong-import-position,missing-docstring
+import nonogrampy
+from nonogrampy.raster import BLACK
+from nonogrampy.raster import UNKNOWN
+from nonogrampy.raster import WHITE
+
+from nonogrampy.rules import automaton
+from nonogrampy.rules import dp
+from nonogrampy.tests.helpers import new_line
+
+
+class TestAutomaton(unittest.TestCase):
+    def test_compile(self):
+        # "XX X": the states before each cell of the pattern and the final one
+        compiled = automaton.Automaton.compile([2, 1])
+        self.assertEqual(5, compiled.nstates)
+        self.assertEqual(0b01011, compiled.black)
+        self.assertEqual(0b00100, compiled.white)
+        self.assertEqual(0b11001, compiled.loop)
+        self.assertEqual(((0, 3), (1, 3)), (compiled.firsts, compiled.lasts))
+
+        # compiled once per line, shared by the copies
+        meta = new_line(5, [2, 1])
+        compiled = automaton.compile_line(meta)
+        self.assertIs(compiled, automaton.compile_line(copy.deepcopy(meta)))
+
+    def test_same_as_dp(self):
+        for lengths in ([0], [1], [3], [1, 1], [2, 1], [1, 2, 1]):
+            for cells in itertools.product((BLACK, WHITE, UNKNOWN), repeat=6):
+                expected_mask, expected_meta = bytearray(cells), new_line(6, lengths)
+                try:
+                    dp.fill_forced_cells(expected_mask, expected_meta)
+                except nonogrampy.DiscrepancyInModel:
+                    with self.assertRaises(nonogrampy.DiscrepancyInModel):
+                        automaton.fill_forced_cells(
+                            bytearray(cells), new_line(6, lengths)
+                        )
+                    continue
+
+                mask, meta = bytearray(cells), new_line(6, lengths)
+                automaton.fill_forced_cells(mask, meta)
+                self.assertEqual(expected_mask, mask, (lengths, bytes(cells)))
+                self.assertEqual(expected_meta, meta, (lengths, bytes(cells)))
+
+
+if __name__ == "__main__":
+    unittest.main()
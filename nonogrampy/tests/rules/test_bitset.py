@@ -0,0 +1,22 @@
+#!/usr/bin/env python
+
+import unittest
+
+# pylint: disable=wrong-import-position,missing-docstring
+from nonogrampy.rules import bitset
+
+
+class TestBitset(unittest.TestCase):
+    def test_bits(self):
+        self.assertEqual(0b1001, bitset.black_bits(bytearray(b"X. X")))
+        self.assertEqual(0b1011, bitset.non_white_bits(bytearray(b"X. X")))
+        self.assertEqual(0, bitset.black_bits(bytearray()))
+
+    def test_runs(self):
+        self.assertEqual([], bitset.runs(0))
+        self.assertEqual([(0, 0)], bitset.runs(0b1))
+        self.assertEqual([(1, 2), (4, 4), (6, 9)], bitset.runs(0b1111010110))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,68 @@
+#!/usr/bin/env python
+
+import copy
+import itertools
+import unittest
+
+# pylint: disable=wrong-import-position,missing-docstring
+import nonogrampy
+from nonogrampy.raster import BLACK
+from nonogrampy.raster import UNKNOWN
+from nonogrampy.raster import WHITE
+from nonogrampy.raster import line
+from nonogrampy.raster.block import Block
+
+from nonogrampy.rules import closed
+from nonogrampy.rules import dp
+from nonogrampy.tests.helpers import new_line
+
+
+class TestClosed(unittest.TestCase):
+    def test_clue_shape(self):
+        self.assertEqual(line.SHAPE_EMPTY, new_line(5, [0]).shape)
+        self.assertEqual(line.SHAPE_EMPTY, new_line(5, []).shape)
+        self.assertEqual(line.SHAPE_FULL, new_line(5, [5]).shape)
+        self.assertEqual(line.SHAPE_FULL, new_line(5, [1, 1, 1]).shape)
+        self.assertEqual(line.SHAPE_SINGLE, new_line(5, [3]).shape)
+        self.assertEqual(line.SHAPE_GENERAL, new_line(5, [1, 1]).shape)
+
+    def test_solve_single(self):
+        mask = bytearray(b". .X....")
+        meta = new_line(8, [3])
+        closed.solve_single(mask, meta)
+        self.assertEqual(bytearray(b"  .XX.  "), mask)
+        self.assertEqual([Block(2, 5, 3)], meta.blocks)
+
+        # no placement covers the short segment between the extreme ones
+        mask = bytearray(b"... . ...")
+        meta = new_line(9, [3])
+        closed.solve_single(mask, meta)
+        self.assertEqual(bytearray(b"...   ..."), mask)
+        self.assertEqual([Block(0, 8, 3)], meta.blocks)
+
+    def test_same_as_dp(self):
+        funcs = {
+            line.SHAPE_EMPTY: closed.solve_empty,
+            line.SHAPE_FULL: closed.solve_full,
+            line.SHAPE_SINGLE: closed.solve_single,
+        }
+        for lengths in ([0], [1], [3], [9], [2, 6], [1, 1, 2, 2]):
+            for cells in itertools.product((BLACK, WHITE, UNKNOWN), repeat=9):
+                meta = new_line(9, lengths)
+                func = funcs[meta.shape]
+                expected_mask, expected_meta = bytearray(cells), copy.deepcopy(meta)
+                try:
+                    dp.fill_forced_cells(expected_mask, expected_meta)
+                except nonogrampy.DiscrepancyInModel:
+                    with self.assertRaises(nonogrampy.DiscrepancyInModel):
+                        func(bytearray(cells), meta)
+                    continue
+
+                mask = bytearray(cells)
+                func(mask, meta)
+                self.assertEqual(expected_mask, mask, (lengths, bytes(cells)))
+                self.assertEqual(expected_meta, meta, (lengths, bytes(cells)))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,89 @@
+#!/usr/bin/env python
+
+import itertools
+import unittest
+
+# pylint: disable=wrong-import-position,missing-docstring
+import nonogrampy
+from nonogrampy.raster import BLACK
+from nonogrampy.raster import UNKNOWN
+from nonogrampy.raster import WHITE
+from nonogrampy.raster.block import Block
+
+from nonogrampy.rules import dp
+from nonogrampy.tests.helpers import new_line
+
+
+def _brute_force(mask, lengths):
+    """Return the cells that have the same color in every solution of the
+    line (UNKNOWN otherwise) or None if there's no solution at all."""
+    res = None
+    for cells in itertools.product((BLACK, WHITE), repeat=len(mask)):
+        if any(m != UNKNOWN and m != c for m, c in zip(mask, cells)):
+            continue
+        runs = [len(run) for run in bytes(cells).split(bytes([WHITE])) if run]
+        if runs != [length for length in lengths if length]:
+            continue
+        if res is None:
+            res = bytearray(cells)
+        else:
+            for i, cell in enumerate(cells):
+                if res[i] != cell:
+                    res[i] = UNKNOWN
+
+    return res
+
+
+class TestDP(unittest.TestCase):
+    def test_fill_forced_cells(self):
+        # overlap of the leftmost and rightmost placement
+        mask = bytearray(b"..........")
+        meta = new_line(10, [7])
+        dp.fill_forced_cells(mask, meta)
+        self.assertEqual(bytearray(b"...XXXX..."), mask)
+        self.assertEqual([Block(0, 9, 7)], meta.blocks)
+
+        # empty line
+        mask = bytearray(b".....")
+        dp.fill_forced_cells(mask, new_line(5, [0]))
+        self.assertEqual(bytearray(b"     "), mask)
+
+        # the second block fits only after the white cell
+        mask = bytearray(b"..X. .")
+        meta = new_line(6, [2, 1])
+        dp.fill_forced_cells(mask, meta)
+        self.assertEqual(bytearray(b" .X. X"), mask)
+        self.assertEqual([Block(1, 3, 2), Block(5, 5, 1)], meta.blocks)
+
+        # ranges are narrowed to the valid placements
+        mask = bytearray(b".. X.....")
+        meta = new_line(9, [2, 3])
+        dp.fill_forced_cells(mask, meta)
+        self.assertEqual(bytearray(b".. XX...."), mask)
+        self.assertEqual([Block(0, 4, 2), Block(3, 8, 3)], meta.blocks)
+
+    def test_discrepancy(self):
+        with self.assertRaises(nonogrampy.DiscrepancyInModel):
+            dp.fill_forced_cells(bytearray(b"X...X"), new_line(5, [3]))
+
+        with self.assertRaises(nonogrampy.DiscrepancyInModel):
+            dp.fill_forced_cells(bytearray(b".. .."), new_line(5, [3]))
+
+        with self.assertRaises(nonogrampy.DiscrepancyInModel):
+            dp.fill_forced_cells(bytearray(b"..X.."), new_line(5, [0]))
+
+    def test_against_brute_force(self):
+        for lengths in ([0], [1], [3], [1, 1], [2, 1], [1, 2, 1]):
+            for cells in itertools.product((BLACK, WHITE, UNKNOWN), repeat=6):
+                mask = bytearray(cells)
+                expected = _brute_force(mask, lengths)
+                if expected is None:
+                    with self.assertRaises(nonogrampy.DiscrepancyInModel):
+                        dp.fill_forced_cells(mask, new_line(6, lengths))
+                else:
+                    dp.fill_forced_cells(mask, new_line(6, lengths))
+                    self.assertEqual(expected, mask, (lengths, bytes(cells)))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -37,6 +37,41 @@ class TestRules(unittest.TestCase):
         covering_blocks = rules._covering_blocks(blocks, start=0)
         self.assertEqual([], covering_blocks)
 
+    def test_block_index(self):
+        blocks = [
+            Block(start=0, end=4, length=1),
+            Block(start=2, end=6, length=3),
+            Block(start=5, end=9, length=1),
+        ]
+        index = rules._BlockIndex(blocks)
+
+        self.assertEqual(blocks[:2], index.covering(3))
+        self.assertEqual(blocks[1:2], index.covering(3, 5))
+        self.assertEqual([], index.covering(4, 7))
+        self.assertEqual(1, index.min_length(2))
+        self.assertEqual(3, index.min_length(3, 6))
+        self.assertEqual(0, index.min_length(4, 7))
+        self.assertEqual(1, index.max_length_other(1, 3))
+        self.assertEqual(3, index.max_length_other(0, 3))
+        self.assertIsNone(index.max_length_other(1, 3, 5))
+        self.assertTrue(index.covered_by_other(0, 3))
+        self.assertFalse(index.covered_by_other(1, 3, 5))
+
+        # the range of a block changed so the blocks are not in order anymore
+        blocks[1].start = 6
+        blocks[1].end = 10
+        index.refresh(1)
+        self.assertEqual(blocks[2:], index.covering(5))
+        self.assertEqual(blocks[1:], index.covering(6, 9))
+
+        # the same as the scanning implementation
+        for start in range(11):
+            for end in range(start, 11):
+                self.assertEqual(
+                    rules._covering_blocks(blocks, start, end),
+                    index.covering(start, end),
+                )
+
     def test_get_black_runs(self):
         # mask = bytearray(map(ord, 'X.X  ..X..X. .X'))
         mask = bytearray(
@@ -122,6 +157,35 @@ class TestRules(unittest.TestCase):
         expected = [Block(start=0, end=0, length=1), Block(start=5, end=7, length=3)]
         self.assertEqual(expected, rules._get_non_white_runs(mask))
 
+    def test_run_index(self):
+        mask = bytearray(b"XX. .X..XXX X")
+        index = rules._run_index(mask)
+        self.assertIs(index, rules._run_index(bytearray(mask)))
+        self.assertEqual(
+            [Block(0, 1, 2), Block(5, 5, 1), Block(8, 10, 3), Block(12, 12, 1)],
+            index.black_runs,
+        )
+        self.assertEqual(
+            [Block(0, 2, 3), Block(4, 10, 7), Block(12, 12, 1)], index.non_white_runs
+        )
+
+        self.assertEqual([Block(5, 5, 1)], index.runs_within(1, 9))
+        self.assertEqual([Block(5, 5, 1), Block(8, 10, 3)], index.runs_within(5, 10))
+        self.assertEqual([], index.runs_within(6, 9))
+        self.assertEqual(
+            [Block(5, 5, 1), Block(8, 10, 3)], index.runs_starting_within(1, 9)
+        )
+        self.assertEqual(
+            [Block(0, 1, 2), Block(5, 5, 1)], index.runs_ending_within(1, 9)
+        )
+
+        # writing the mask gives a new index
+        mask[2] = BLACK
+        self.assertEqual(
+            [Block(0, 2, 3), Block(5, 5, 1), Block(8, 10, 3), Block(12, 12, 1)],
+            rules._get_black_runs(mask),
+        )
+
 
 if __name__ == "__main__":
     unittest.main()
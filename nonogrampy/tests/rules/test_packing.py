@@ -0,0 +1,36 @@
+#!/usr/bin/env python
+
+import unittest
+
+# pylint: disable=wrong-import-position,missing-docstring
+from nonogrampy.raster.block import Block
+from nonogrampy.raster.line import Line
+
+from nonogrampy.rules import packing
+
+
+class TestPacking(unittest.TestCase):
+    def test_pack_blocks(self):
+        mask = bytearray(b"..........")
+        meta = Line(10, 0, [Block(0, 9, 4), Block(0, 9, 1), Block(0, 9, 2)])
+        packing.pack_blocks(mask, meta)
+        self.assertEqual(bytearray(b".XXX....X."), mask)
+        self.assertEqual([Block(0, 4, 4), Block(5, 6, 1), Block(7, 9, 2)], meta.blocks)
+
+        # the ranges are not widened
+        mask = bytearray(b".....")
+        meta = Line(5, 0, [Block(1, 3, 2)])
+        packing.pack_blocks(mask, meta)
+        self.assertEqual(bytearray(b"..X.."), mask)
+        self.assertEqual([Block(1, 3, 2)], meta.blocks)
+
+        # empty line
+        mask = bytearray(b"...")
+        meta = Line(3, 0, [Block(0, 2, 0)])
+        packing.pack_blocks(mask, meta)
+        self.assertEqual(bytearray(b"..."), mask)
+        self.assertEqual([Block(0, 2, 0)], meta.blocks)
+
+
+if __name__ == "__main__":
+    unittest.main()
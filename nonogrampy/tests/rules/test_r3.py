@@ -5,6 +5,7 @@ import os
 import unittest
 
 # pylint: disable=wrong-import-position,missing-docstring
+import nonogrampy
 from nonogrampy.raster import BLACK
 from nonogrampy.raster import UNKNOWN
 from nonogrampy.raster import WHITE
@@ -115,6 +116,27 @@ class TestR3(unittest.TestCase):
         self.assertEqual(expected_mask, mask)
         self.assertEqual(expected_meta, meta)
 
+    def test_rule_3_3_1_discrepancy(self):
+        # no room left for the first block before the black cell
+        mask = bytearray([UNKNOWN, BLACK] + [UNKNOWN] * 3)
+        meta = Line(
+            size=5,
+            idx=0,
+            blocks=[Block(start=0, end=0, length=1), Block(start=1, end=4, length=2)],
+        )
+        with self.assertRaises(nonogrampy.DiscrepancyInModel):
+            r3.rule_3_3_1(mask, meta)
+
+        # no room left for the last block after the black run
+        mask = bytearray([UNKNOWN] * 2 + [BLACK] + [UNKNOWN] * 2)
+        meta = Line(
+            size=5,
+            idx=0,
+            blocks=[Block(start=2, end=3, length=2), Block(start=3, end=4, length=1)],
+        )
+        with self.assertRaises(nonogrampy.DiscrepancyInModel):
+            r3.rule_3_3_1(mask, meta)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,36 @@
+#!/usr/bin/env python
+
+import unittest
+
+# pylint: disable=wrong-import-position,missing-docstring
+import nonogrampy
+from nonogrampy import solver
+
+from nonogrampy.rules import r4
+from nonogrampy.tests.helpers import new_line
+
+
+class TestR4(unittest.TestCase):
+    def test_fill_by_lookahead(self):
+        mask = bytearray(b".. X...")
+        meta = new_line(7, [2, 1])
+        r4.fill_by_lookahead(mask, meta)
+        self.assertEqual(bytearray(b".. X. ."), mask)
+        self.assertEqual([(0, 4), (3, 6)], meta.ranges())
+
+        with self.assertRaises(nonogrampy.DiscrepancyInModel):
+            r4.fill_by_lookahead(bytearray(b"X.X"), new_line(3, [1]))
+
+    def test_stalled_line(self):
+        # the rules of the paper can't advance this line
+        mask = bytearray(b".. X...")
+        meta = new_line(7, [2, 1])
+        solver.linesolve_inner(mask, meta, fixpoint=True)
+        self.assertEqual(bytearray(b".. X..."), mask)
+
+        solver.linesolve_inner(mask, meta, lookahead=r4.RULES)
+        self.assertEqual(bytearray(b".. X. ."), mask)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,74 @@
+#!/usr/bin/env python
+
+import unittest
+
+# pylint: disable=wrong-import-position
+import nonogrampy
+from nonogrampy import solver
+from nonogrampy.cache import LineCache
+from nonogrampy.raster.block import Block
+from nonogrampy.raster.line import Line
+
+
+class TestLineCache(unittest.TestCase):
+    # pylint: disable=protected-access,missing-docstring
+    def test_lru(self):
+        cache = LineCache(2)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        self.assertEqual(1, cache.get("a"))
+
+        # "b" is the least recently used one
+        cache.put("c", 3)
+        self.assertEqual(2, len(cache))
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(1, cache.get("a"))
+        self.assertEqual(3, cache.get("c"))
+        self.assertEqual((3, 1), (cache.hits, cache.misses))
+
+        cache.clear()
+        self.assertEqual((0, 0, 0), (len(cache), cache.hits, cache.misses))
+
+    def test_disabled(self):
+        cache = LineCache(0)
+        cache.put("a", 1)
+        self.assertIsNone(cache.get("a"))
+
+    def test_cached_linesolve_inner(self):
+        cache = LineCache(10)
+        for engine in solver.ENGINES:
+            expected_mask = bytearray(b"....X.....")
+            expected_meta = Line(10, 0, [Block(0, 9, 2), Block(0, 9, 3)])
+            solver.linesolve_inner(expected_mask, expected_meta, solver.ENGINES[engine])
+
+            # miss, then hit
+            for _ in range(2):
+                mask = bytearray(b"....X.....")
+                meta = Line(10, 0, [Block(0, 9, 2), Block(0, 9, 3)])
+                solver._cached_linesolve_inner(
+                    mask, meta, solver.ENGINES[engine], cache
+                )
+
+                self.assertEqual(expected_mask, mask)
+                self.assertEqual(expected_meta, meta)
+
+        # a miss and a hit per engine
+        nengines = len(solver.ENGINES)
+        self.assertEqual((nengines, nengines), (cache.hits, cache.misses))
+
+    def test_cached_discrepancy(self):
+        cache = LineCache(10)
+        for _ in range(2):
+            with self.assertRaises(nonogrampy.DiscrepancyInModel):
+                solver._cached_linesolve_inner(
+                    bytearray(b"X X"),
+                    Line(3, 0, [Block(0, 2, 3)]),
+                    solver.ENGINES[solver.ENGINE_DP],
+                    cache,
+                )
+
+        self.assertEqual((1, 1), (cache.hits, cache.misses))
+
+
+if __name__ == "__main__":
+    unittest.main()
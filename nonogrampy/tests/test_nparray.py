@@ -0,0 +1,100 @@
+#!/usr/bin/env python
+
+import importlib.util
+import io
+import unittest
+
+# pylint: disable=wrong-import-position
+import nonogrampy
+from nonogrampy import solver
+from nonogrampy.raster import BLACK
+from nonogrampy.raster import UNKNOWN
+from nonogrampy.raster import WHITE
+
+_HAS_NUMPY = importlib.util.find_spec("numpy") is not None
+
+_PUZZLE = """
+5 5
+1
+3
+5
+1 1 1
+1 3
+3
+2
+5
+2 1
+3
+"""
+
+
+@unittest.skipUnless(_HAS_NUMPY, "NumPy is not installed")
+class TestNumpyRaster(unittest.TestCase):
+    # pylint: disable=missing-docstring,import-outside-toplevel
+    def _raster(self):
+        from nonogrampy.raster.nparray import NumpyRaster
+
+        return NumpyRaster(
+            table=[bytearray((UNKNOWN for j in range(2))) for i in range(3)],
+            row_meta=[],
+            col_meta=[],
+        )
+
+    def test_table(self):
+        raster = self._raster()
+        self.assertEqual((3, 2), raster.grid.shape)
+        self.assertEqual([bytearray(b"..")] * 3, raster.table)
+
+        raster.table = [bytearray((BLACK, WHITE))]
+        self.assertEqual((1, 2), raster.grid.shape)
+        self.assertEqual(True, raster.is_solved())
+
+    def test_views(self):
+        raster = self._raster()
+        raster.set_cell(1, 0, BLACK)
+        self.assertEqual(bytearray((UNKNOWN, BLACK, UNKNOWN)), raster.get_col(0))
+        self.assertEqual(bytearray((BLACK, UNKNOWN)), raster.get_row(1))
+
+        # views are not copies
+        raster.col_view(1)[2] = WHITE
+        self.assertEqual(bytearray((UNKNOWN, WHITE)), raster.get_row(2))
+
+    def test_clone(self):
+        raster = self._raster()
+        clone = raster.clone()
+        self.assertIs(raster.grid, clone.grid)
+
+        # the array is copied on write
+        clone.update_row(idx=0, mask=bytearray(b"X "))
+        raster.set_cell(2, 0, WHITE)
+        self.assertEqual(bytearray(b"X "), clone.get_row(0))
+        self.assertEqual(bytearray(b".."), raster.get_row(0))
+        self.assertEqual(bytearray(b".."), clone.get_row(2))
+        self.assertEqual(bytearray(b" ."), raster.get_row(2))
+
+    def test_update(self):
+        raster = self._raster()
+
+        mask = bytearray([BLACK, WHITE])
+        self.assertEqual([0, 1], raster.update_row(mask=mask, idx=0))
+        self.assertEqual(mask, raster.get_row(0))
+
+        mask = bytearray([BLACK, UNKNOWN, WHITE])
+        self.assertEqual([2], raster.update_col(mask=mask, idx=0))
+        self.assertEqual(bytearray([BLACK, UNKNOWN, WHITE]), raster.get_col(0))
+
+        # known cells differ
+        with self.assertRaises(nonogrampy.DiscrepancyInModel):
+            raster.update_col(mask=bytearray([WHITE, UNKNOWN, UNKNOWN]), idx=0)
+
+    def test_solve(self):
+        from nonogrampy.raster import Raster
+        from nonogrampy.raster.nparray import NumpyRaster
+
+        expected = solver.solve(Raster.from_file(io.StringIO(_PUZZLE)))
+        solution = solver.solve(NumpyRaster.from_file(io.StringIO(_PUZZLE)))
+        self.assertEqual(expected.table, solution.table)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,76 @@
+#!/usr/bin/env python
+
+import io
+import json
+import unittest
+
+# pylint: disable=wrong-import-position
+import nonogrampy
+from nonogrampy import solver
+from nonogrampy.profiling import RuleProfile
+from nonogrampy.raster import Raster
+from nonogrampy.raster import UNKNOWN
+from nonogrampy.raster.block import Block
+from nonogrampy.raster.line import Line
+from nonogrampy.rules import r1
+
+_PUZZLE = """
+5 5
+1
+3
+5
+1 1 1
+1 3
+3
+2
+5
+2 1
+3
+"""
+
+
+class TestRuleProfile(unittest.TestCase):
+    # pylint: disable=missing-docstring
+    def test_linesolve(self):
+        profile = RuleProfile()
+        raster = Raster.from_file(io.StringIO(_PUZZLE))
+        self.assertIsNotNone(
+            solver.linesolve(
+                raster, solver.Options(profile=profile, shape_pipelines=False)
+            )
+        )
+
+        self.assertEqual(len(solver.RULE_FUNCS), len(profile.stats))
+        self.assertIn("R1.1 fill_intersections", profile.stats)
+        # every cell has been colored by one of the rules
+        self.assertEqual(25, sum(stats.cells for stats in profile.stats.values()))
+        calls = {stats.calls for stats in profile.stats.values()}
+        self.assertEqual(1, len(calls))
+
+        out = io.StringIO()
+        profile.to_json(out)
+        self.assertEqual(
+            profile.stats["R1.2 check_spaces"].calls,
+            json.loads(out.getvalue())["R1.2 check_spaces"]["calls"],
+        )
+        self.assertTrue(str(profile).startswith("rule "))
+
+    def test_ranges_and_discrepancies(self):
+        profile = RuleProfile()
+        mask = bytearray([UNKNOWN] * 5)
+        meta = Line(5, 0, [Block(0, 4, 2), Block(0, 4, 2)])
+        solver.linesolve_inner(mask, meta, solver.RULE_FUNCS, profile)
+        self.assertEqual(6, profile.stats["R2.1 check_meta_consistency"].ranges)
+
+        with self.assertRaises(nonogrampy.DiscrepancyInModel):
+            solver.linesolve_inner(
+                bytearray(b"XXX.."),
+                Line(5, 0, [Block(0, 4, 2)]),
+                (r1.fill_intersections,),
+                profile,
+            )
+        self.assertEqual(1, profile.stats["R1.1 fill_intersections"].discrepancies)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,5 +1,6 @@
 #!/usr/bin/env python
 
+import copy
 import io
 import os
 import unittest
@@ -186,6 +187,97 @@ class TestRaster(unittest.TestCase):
         self.assertEqual([0, 1], raster.update_col(mask=mask, idx=0))
         self.assertEqual(mask, raster.get_col(0))
 
+    def test_cell_counts(self):
+        raster = Raster(
+            table=[bytearray((UNKNOWN for j in range(2))) for i in range(3)],
+            row_meta=[],
+            col_meta=[],
+        )
+        self.assertEqual((0, 0), raster.filled_cnt(True, 0))
+        self.assertEqual(3, raster.unknown_cnt(False, 1))
+
+        raster.update_col(mask=bytearray([BLACK, WHITE, UNKNOWN]), idx=0)
+        raster.set_cell(0, 1, WHITE)
+        self.assertEqual((1, 1), raster.filled_cnt(True, 0))
+        self.assertEqual((0, 1), raster.filled_cnt(True, 1))
+        self.assertEqual((1, 1), raster.filled_cnt(False, 0))
+        self.assertEqual(2, raster.unknown_cnt(False, 1))
+
+        # the clone has its own counters
+        clone = copy.deepcopy(raster)
+        clone.update_row(mask=bytearray([WHITE, BLACK]), idx=2)
+        self.assertEqual(0, clone.unknown_cnt(True, 2))
+        self.assertEqual(2, raster.unknown_cnt(True, 2))
+
+        raster.update_row(mask=bytearray([WHITE, BLACK]), idx=1)
+        self.assertFalse(raster.is_solved())
+        raster.update_row(mask=bytearray([BLACK, WHITE]), idx=2)
+        self.assertTrue(raster.is_solved())
+        self.assertEqual((2, 1), raster.filled_cnt(False, 0))
+
+    def test_deepcopy(self):
+        raster = Raster(
+            table=[bytearray((UNKNOWN for j in range(2))) for i in range(2)],
+            row_meta=[Row(2, i, [Block(0, 1, 1)]) for i in range(2)],
+            col_meta=[Column(2, i, [Block(0, 1, 1)]) for i in range(2)],
+        )
+
+        clone = copy.deepcopy(raster)
+        self.assertEqual(raster.table, clone.table)
+        self.assertEqual(raster.row_meta, clone.row_meta)
+        self.assertEqual(raster.col_meta, clone.col_meta)
+        self.assertFalse(clone.col_meta[1].is_row)
+
+        # the clone is independent of the original
+        clone.set_cell(0, 0, BLACK)
+        clone.row_meta[0].blocks[0].end = 0
+        self.assertEqual(UNKNOWN, raster.get_row(0)[0])
+        self.assertEqual(Block(0, 1, 1), raster.row_meta[0].blocks[0])
+
+    def test_clone(self):
+        raster = Raster(
+            table=[bytearray((UNKNOWN for j in range(2))) for i in range(2)],
+            row_meta=[Row(2, i, [Block(0, 1, 1)]) for i in range(2)],
+            col_meta=[Column(2, i, [Block(0, 1, 1)]) for i in range(2)],
+        )
+
+        clone = raster.clone()
+        # the rows are shared until they are modified, the lines are shared
+        self.assertIs(raster._table[1], clone._table[1])
+        self.assertIs(raster.row_meta[0], clone.row_meta[0])
+
+        clone.set_cell(0, 0, BLACK)
+        clone.update_col(idx=1, mask=bytearray(b". "))
+        clone.set_line(clone.row_meta[0].with_ranges([(0, 0)]))
+
+        self.assertEqual([bytearray(b"X."), bytearray(b". ")], clone.table)
+        self.assertEqual([bytearray(b".."), bytearray(b"..")], raster.table)
+        self.assertEqual((1, 0), clone.filled_cnt(True, 0))
+        self.assertEqual((0, 0), raster.filled_cnt(True, 0))
+        self.assertEqual(Block(0, 0, 1), clone.row_meta[0].blocks[0])
+        self.assertEqual(Block(0, 1, 1), raster.row_meta[0].blocks[0])
+        self.assertIs(raster.row_meta[1], clone.row_meta[1])
+
+        # the original copies on write too (the rows of the first clone have
+        # all been copied already)
+        clone = raster.clone()
+        self.assertIs(raster._table[1], clone._table[1])
+        raster.set_cell(1, 1, BLACK)
+        self.assertIsNot(raster._table[1], clone._table[1])
+        self.assertEqual(UNKNOWN, clone.get_row(1)[1])
+        self.assertEqual(BLACK, raster.get_row(1)[1])
+        self.assertEqual((0, 0), clone.filled_cnt(True, 1))
+
+    def test_with_ranges(self):
+        meta = Row(9, 3, [Block(0, 8, 1), Block(0, 8, 2), Block(0, 8, 3)])
+        new = meta.with_ranges([(0, 8), (2, 5), (0, 8)])
+        self.assertEqual([(0, 8), (2, 5), (0, 8)], new.ranges())
+        self.assertEqual((3, True), (new.idx, new.is_row))
+        # the unchanged blocks are shared, the original is left intact
+        self.assertIs(meta.blocks[0], new.blocks[0])
+        self.assertIs(meta.blocks[2], new.blocks[2])
+        self.assertEqual(Block(0, 8, 2), meta.blocks[1])
+
 
 if __name__ == "__main__":
     unittest.main()
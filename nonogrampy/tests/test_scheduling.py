@@ -0,0 +1,53 @@
+#!/usr/bin/env python
+
+import unittest
+
+# pylint: disable=wrong-import-position
+from nonogrampy import solver
+from nonogrampy.raster.block import Block
+from nonogrampy.raster.line import Column
+from nonogrampy.raster.line import Row
+from nonogrampy.scheduling import RuleScheduler
+
+
+class TestRuleScheduler(unittest.TestCase):
+    # pylint: disable=missing-docstring
+    def test_skip(self):
+        meta = Row(5, 0, [Block(0, 4, 2)])
+        scheduler = RuleScheduler(2)
+        self.assertFalse(scheduler.skip(meta, 0))
+
+        scheduler.record(meta, 0, 2, False)
+        self.assertFalse(scheduler.skip(meta, 0))
+        scheduler.record(meta, 0, 2, False)
+        self.assertTrue(scheduler.skip(meta, 0))
+        self.assertFalse(scheduler.skip(meta, 1))
+        # the column of the same index is scheduled separately
+        self.assertFalse(scheduler.skip(Column(5, 0, [Block(0, 4, 2)]), 0))
+
+        scheduler.record(meta, 0, 2, True)
+        self.assertFalse(scheduler.skip(meta, 0))
+
+    def test_take_unverified(self):
+        meta = Row(5, 0, [Block(0, 4, 2)])
+        scheduler = RuleScheduler(1)
+        scheduler.record(meta, 0, 1, False)
+        scheduler.done(meta, False)
+
+        self.assertEqual([meta], scheduler.take_unverified())
+        self.assertEqual([], scheduler.take_unverified())
+        # all the rules are applied on the line again
+        self.assertFalse(scheduler.skip(meta, 0))
+
+    def test_linesolve_inner(self):
+        scheduler = RuleScheduler(1)
+        meta = Row(10, 0, [Block(0, 9, 2), Block(0, 9, 3)])
+        mask = bytearray(b"....X.....")
+        self.assertTrue(solver.linesolve_inner(mask, meta, scheduler=scheduler))
+
+        # the rules not changing the line first time are skipped
+        self.assertFalse(solver.linesolve_inner(mask, meta, scheduler=scheduler))
+
+
+if __name__ == "__main__":
+    unittest.main()
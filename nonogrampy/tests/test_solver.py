@@ -1,18 +1,72 @@
 #!/usr/bin/env python
 
+import copy
 from glob import fnmatch
+import io
 import os
 import unittest
 
 # pylint: disable=wrong-import-position
 import nonogrampy
 from nonogrampy import solver
+from nonogrampy.raster import BLACK
 from nonogrampy.raster import Raster
+from nonogrampy.raster import WHITE
+from nonogrampy.raster.block import Block
+from nonogrampy.raster.line import Column
+from nonogrampy.raster.line import Row
+from nonogrampy.tests.helpers import load_example
+from nonogrampy.trail import Trail
 
 _PUZZLE_EXT = "nin"
 
 
+# probing finds a cell of it that can be neither BLACK nor WHITE
+_NO_SOLUTION = """7 8
+1 1
+3 2
+1
+2 1
+3
+1 1 1
+1 1 1
+2 1
+1 1
+2 3
+4 1
+1 1
+1 1 1
+1 1 1
+1 2
+"""
+
+# the rules run on inconsistent lines of its guesses if the checks are deferred
+_INCONSISTENT_GUESSES = """10 10
+1 2 1
+1 5 1
+1 1 1
+2 1 2
+2 1
+1 3
+1 2
+1 4 1
+3 1
+1 2 1
+2 1 2
+1 1 1
+1 1 3
+5 1
+2 1 1
+1 2
+2 3
+2 1 1
+1 3
+1 3
+"""
+
+
 class TestSolver(unittest.TestCase):
+    # pylint: disable=protected-access
     def test_model_integrity(self):
         """Test that no discrepacy occurs during the solving process."""
         err_in_model = []
@@ -39,6 +93,195 @@ class TestSolver(unittest.TestCase):
 
         self.assertFalse(err_in_model)
 
+    def test_propagation_modes_reach_same_fixpoint(self):
+        for name in ("010-skids.nin", "025-edge.nin", "065-bird.nin"):
+            sweep = load_example(name)
+            solver.linesolve(
+                sweep, solver.Options(propagation=solver.PROPAGATION_SWEEP)
+            )
+
+            for propagation in (solver.PROPAGATION_QUEUE, solver.PROPAGATION_PRIORITY):
+                raster = load_example(name)
+                solver.linesolve(raster, solver.Options(propagation=propagation))
+
+                self.assertEqual(sweep.table, raster.table, name)
+                self.assertEqual(sweep.row_meta, raster.row_meta, name)
+                self.assertEqual(sweep.col_meta, raster.col_meta, name)
+
+    def test_adaptive_reaches_same_fixpoint(self):
+        for name in ("010-skids.nin", "025-edge.nin", "065-bird.nin"):
+            expected = load_example(name)
+            solver.linesolve(expected)
+
+            for propagation in solver.PROPAGATIONS:
+                raster = load_example(name)
+                solver.linesolve(
+                    raster, solver.Options(propagation=propagation, adaptive=True)
+                )
+
+                self.assertEqual(expected.table, raster.table, name)
+                self.assertEqual(expected.row_meta, raster.row_meta, name)
+                self.assertEqual(expected.col_meta, raster.col_meta, name)
+
+    def test_local_fixpoint(self):
+        mask = bytearray(b"....X.....")
+        meta = Row(10, 0, [Block(0, 9, 2), Block(0, 9, 3)])
+        solver.linesolve_inner(mask, meta, fixpoint=True)
+
+        # another round doesn't change the line
+        expected_mask, expected_meta = bytearray(mask), copy.deepcopy(meta)
+        solver.linesolve_inner(mask, meta)
+        self.assertEqual(expected_mask, mask)
+        self.assertEqual(expected_meta, meta)
+
+        for name in ("010-skids.nin", "065-bird.nin"):
+            expected = load_example(name)
+            solver.linesolve(expected)
+
+            raster = load_example(name)
+            solver.linesolve(raster, solver.Options(local_fixpoint=True))
+            self.assertEqual(expected.table, raster.table, name)
+            self.assertEqual(expected.row_meta, raster.row_meta, name)
+            self.assertEqual(expected.col_meta, raster.col_meta, name)
+
+    def test_segments(self):
+        opts = solver.Options()
+        # the range of the second block spans a WHITE cell
+        mask = bytearray(b"..X.. ....")
+        meta = Row(10, 0, [Block(0, 4, 2), Block(3, 9, 3)])
+        self.assertIsNone(solver._split_line(mask, meta, opts))
+
+        meta = Row(10, 0, [Block(0, 4, 2), Block(6, 9, 3)])
+        segments = solver._split_line(mask, meta, opts)
+        self.assertEqual([(0, 4), (6, 9)], [seg[:2] for seg in segments])
+        self.assertEqual([[meta.blocks[0]], [meta.blocks[1]]], [s[2] for s in segments])
+
+        solver._solve_segments(mask, meta, segments, opts, None, solver._check_line)
+        self.assertEqual(bytearray(b" .X.  .XX."), mask)
+        self.assertEqual([(1, 3), (6, 9)], meta.ranges())
+
+        expected = solver.solve(load_example("065-bird.nin"))
+        opts = solver.Options(segments=True)
+        self.assertEqual(
+            expected, solver.solve(load_example("065-bird.nin"), opts=opts)
+        )
+
+    def test_checks(self):
+        expected = solver.solve(load_example("065-bird.nin"))
+        for checks in (solver.CHECKS_LINE, solver.CHECKS_FINAL):
+            opts = solver.Options(checks=checks)
+            self.assertEqual(
+                expected, solver.solve(load_example("065-bird.nin"), opts=opts)
+            )
+
+        expected = solver.solve(Raster.from_file(io.StringIO(_INCONSISTENT_GUESSES)))
+        self.assertIsNotNone(expected)
+        for checks in (solver.CHECKS_LINE, solver.CHECKS_FINAL):
+            opts = solver.Options(checks=checks, local_fixpoint=True)
+            raster = Raster.from_file(io.StringIO(_INCONSISTENT_GUESSES))
+            self.assertEqual(expected, solver.solve(raster, opts=opts))
+
+    def test_verify_solved(self):
+        raster = Raster(
+            table=[bytearray(b"X "), bytearray(b" X")],
+            row_meta=[Row(2, i, [Block(0, 1, 1)]) for i in range(2)],
+            col_meta=[Column(2, i, [Block(0, 1, 1)]) for i in range(2)],
+        )
+        solver.verify_solved(raster)
+
+        raster.col_meta[1] = Column(2, 1, [Block(0, 1, 2)])
+        with self.assertRaises(nonogrampy.DiscrepancyInModel):
+            solver.verify_solved(raster)
+
+    def test_search(self):
+        raster = load_example("115-cb-test-3.nin")
+        self.assertIsNone(solver.linesolve(raster))
+        expected = copy.deepcopy(raster)
+
+        # a guess and its consequences are rolled back by the trail
+        trail = Trail()
+        for row_idx, col_idx, color in solver._guesses(raster):
+            raster.set_cell(row_idx, col_idx, color)
+            trail.record(raster.row_meta[row_idx], cells=(col_idx,))
+            try:
+                solver.linesolve(raster, solver.Options(trail=trail))
+            except nonogrampy.DiscrepancyInModel:
+                pass
+            self.assertGreater(len(trail), 1)
+
+            trail.undo(raster, 0)
+            self.assertEqual(0, len(trail))
+            self.assertEqual(expected.table, raster.table)
+            self.assertEqual(expected.row_meta, raster.row_meta)
+            self.assertEqual(expected.col_meta, raster.col_meta)
+            self.assertEqual(
+                expected.filled_cnt(True, row_idx), raster.filled_cnt(True, row_idx)
+            )
+
+        solution = solver.search(raster)
+        self.assertIsNotNone(solution)
+        for row_idx, row in enumerate(solution.table):
+            for col_idx, cell in enumerate(row):
+                raster.set_cell(row_idx, col_idx, cell)
+        solver.verify_solved(raster)
+
+    def test_probe(self):
+        expected = solver.search(load_example("145-dog.nin"), solver.Options(probing=0))
+
+        raster = load_example("145-dog.nin")
+        self.assertIsNone(solver.linesolve(raster))
+        self.assertEqual(expected, solver.probe(raster, budget=10000))
+
+        # nothing is left to probe within the budget
+        raster = load_example("145-dog.nin")
+        solver.linesolve(raster)
+        self.assertIsNone(solver.probe(raster, budget=1))
+
+        # a contradiction found by probing means there's no solution
+        raster = Raster.from_file(io.StringIO(_NO_SOLUTION))
+        self.assertIsNone(solver.solve(raster))
+
+        # probing is a kind of guessing
+        with self.assertRaises(SystemExit):
+            solver.solve(load_example("035-smiley.nin"), no_bifurcation=True)
+
+    def test_forced_cells(self):
+        black = {(0, 0): BLACK, (0, 1): WHITE, (1, 1): BLACK}
+        white = {(0, 0): WHITE, (0, 1): WHITE, (1, 1): WHITE}
+        self.assertEqual({(0, 1): WHITE}, solver._forced_cells(0, 0, black, white))
+        self.assertEqual({(0, 0): WHITE}, solver._forced_cells(0, 0, None, white))
+        self.assertEqual({(0, 0): BLACK}, solver._forced_cells(0, 0, black, None))
+        with self.assertRaises(nonogrampy.DiscrepancyInModel):
+            solver._forced_cells(0, 0, None, None)
+
+    def test_dp_engine(self):
+        # the rules of the paper stall on this puzzle
+        king = os.path.join("not-solved", "king.nin")
+        self.assertIsNone(solver.linesolve(load_example(king)))
+
+        raster = load_example(king)
+        solution = solver.linesolve(raster, solver.Options(engine=solver.ENGINE_DP))
+        self.assertIsNotNone(solution)
+
+        # the automaton engine is complete too
+        raster = load_example(king)
+        opts = solver.Options(engine=solver.ENGINE_AUTOMATON)
+        self.assertEqual(solution, solver.linesolve(raster, opts))
+
+    def test_line_priority(self):
+        meta = Row(5, 0, [Block(0, 4, 2)])
+        # solved lines come first
+        self.assertEqual(float("inf"), solver._line_priority(meta, 0, 0))
+        # more newly fixed crossing cells -> higher priority
+        self.assertLess(
+            solver._line_priority(meta, 5, 0), solver._line_priority(meta, 5, 2)
+        )
+        # less room for the blocks -> higher priority
+        self.assertLess(
+            solver._line_priority(meta, 5, 0),
+            solver._line_priority(Row(5, 0, [Block(1, 3, 2)]), 5, 0),
+        )
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,104 @@
+#!/usr/bin/env python
+
+import os
+import tempfile
+import unittest
+
+# pylint: disable=wrong-import-position
+import nonogrampy
+from nonogrampy import solver
+from nonogrampy.raster.block import Block
+from nonogrampy.raster.line import Line
+from nonogrampy.table import LineTable
+
+
+class TestLineTable(unittest.TestCase):
+    # pylint: disable=protected-access,missing-docstring
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp_dir.name, "lines.nlt")
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def _solve(self, table, mask, lengths):
+        mask = bytearray(mask)
+        meta = Line(len(mask), 0, [Block(0, len(mask) - 1, n) for n in lengths])
+        key = table.key(mask, meta)
+        solver._tabulated_linesolve_inner(mask, meta, table, key)
+        return mask, meta
+
+    def test_save_and_load(self):
+        table = LineTable(10)
+        self.assertIsNone(table.key(bytearray(b"." * 11), Line(11, 0, [])))
+
+        lines = (
+            (b"....X.....", (2, 3)),
+            (b"..........", (0,)),
+            (b"...X......", (1, 1, 1, 1, 1)),
+            (b"..........", (10,)),
+        )
+        expected = [self._solve(table, mask, lengths) for mask, lengths in lines]
+        self.assertEqual((0, 4), (table.hits, table.misses))
+        table.save(self.path)
+
+        table = LineTable.load(self.path)
+        try:
+            self.assertEqual(4, len(table))
+            for (mask, lengths), result in zip(lines, expected):
+                self.assertEqual(result, self._solve(table, mask, lengths))
+            self.assertEqual((4, 0), (table.hits, table.misses))
+
+            # the new entries are merged with the loaded ones
+            self._solve(table, b"X.........", (2, 3))
+            table.save(self.path)
+        finally:
+            table.close()
+
+        table = LineTable.load(self.path)
+        try:
+            self.assertEqual((5, 10), (len(table), table.max_length))
+        finally:
+            table.close()
+
+    def test_discrepancy(self):
+        table = LineTable(3)
+        table.save(self.path)
+        table = LineTable.load(self.path)
+        try:
+            for _ in range(2):
+                with self.assertRaises(nonogrampy.DiscrepancyInModel):
+                    self._solve(table, b"X X", (3,))
+            table.save(self.path)
+        finally:
+            table.close()
+
+        table = LineTable.load(self.path)
+        try:
+            with self.assertRaises(nonogrampy.DiscrepancyInModel):
+                self._solve(table, b"X X", (3,))
+            self.assertEqual((1, 0), (table.hits, table.misses))
+        finally:
+            table.close()
+
+    def test_same_as_engine(self):
+        """The result doesn't depend on the narrowed ranges of the line."""
+        table = LineTable(10)
+        mask = bytearray(b"..X.......")
+        meta = Line(10, 0, [Block(0, 3, 2), Block(3, 9, 3)])
+        solver.linesolve_inner(mask, meta, solver.ENGINES[solver.ENGINE_DP])
+
+        for _ in range(2):
+            self.assertEqual((mask, meta), self._solve(table, b"..X.......", (2, 3)))
+
+    def test_invalid_file(self):
+        with open(self.path, "wb") as out:
+            out.write(b"not a line table")
+        with self.assertRaises(ValueError):
+            LineTable.load(self.path)
+        with self.assertRaises(ValueError):
+            LineTable(0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,39 @@
+#!/usr/bin/env python
+
+import io
+import json
+import unittest
+
+# pylint: disable=wrong-import-position
+from nonogrampy import solver
+from nonogrampy import trace
+from nonogrampy.raster import UNKNOWN
+from nonogrampy.tests.helpers import load_example
+
+
+class TestTrace(unittest.TestCase):
+    # pylint: disable=missing-docstring
+    def test_replay(self):
+        # solved by bifurcation, some of the guesses fail
+        out = io.StringIO()
+        opts = solver.Options(trace=trace.Tracer(out))
+        solution = solver.solve(load_example("035-smiley.nin"), opts=opts)
+        self.assertIsNotNone(solution)
+
+        events = [json.loads(line) for line in out.getvalue().splitlines()]
+        self.assertEqual(list(range(len(events))), [e["step"] for e in events])
+        self.assertIn("discrepancy", {e["event"] for e in events})
+
+        # the raster solved last is rebuilt from the trace
+        record, raster = trace.replay(io.StringIO(out.getvalue()))
+        self.assertEqual(events[-1], record)
+        self.assertEqual(solution.table, raster.table)
+
+        # the puzzle before any rule is applied
+        record, raster = trace.replay(io.StringIO(out.getvalue()), step=0)
+        self.assertEqual("raster", record["event"])
+        self.assertTrue(all(row.count(UNKNOWN) == raster.width for row in raster.table))
+
+
+if __name__ == "__main__":
+    unittest.main()
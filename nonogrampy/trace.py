@@ -0,0 +1,180 @@
+"""
+Structured trace of the solving process and its replay.
+
+The trace is a JSON object per line (JSONL), each of them has a "step" (the
+sequence number of the event) and an "event" field:
+
+- raster: a new raster, either the puzzle ("width", "height", "rows", "cols":
+  the [start, end, length] triples of the blocks of the lines) or a guess
+  made on the "parent" raster. "cells" are the [row, col, color] triples of
+  the colored cells (that differ from the parent).
+- rule: a "rule" changed the "idx"'th row (if "row" is true) or column of
+  the "raster": "cells" are the [idx, color] pairs of the colored cells and
+  "ranges" are the [block idx, start, end] triples of the narrowed blocks.
+- discrepancy: a discrepancy has been detected in the "raster".
+"""
+
+import contextlib
+import copy
+import json
+import weakref
+
+from nonogrampy.raster import Raster
+from nonogrampy.raster import UNKNOWN
+from nonogrampy.raster.block import Block
+from nonogrampy.raster.line import Column
+from nonogrampy.raster.line import Row
+from nonogrampy.profiling import rule_name
+
+
+def _blocks(meta):
+    """Return the [start, end, length] triples of the blocks of the line."""
+    return [[block.start, block.end, block.length] for block in meta.blocks]
+
+
+class Tracer:
+    """
+    Writes the events of the solving process to a file. The rules are
+    observed like by RuleProfile (see measure), the rasters are registered by
+    linesolve (begin) and bifurcate (guess).
+    """
+
+    def __init__(self, file_):
+        self.file = file_
+        self.step = 0
+        self._ids = weakref.WeakKeyDictionary()
+        self._next_id = 0
+        self._current = None
+
+    def _write(self, event, **fields):
+        """Write the event to the file."""
+        record = {"step": self.step, "event": event}
+        record.update(fields)
+        self.file.write(json.dumps(record, separators=(",", ":")) + "\n")
+        self.step += 1
+
+    def _register(self, raster, **fields):
+        """Assign an id to the raster and write its event."""
+        self._ids[raster] = self._next_id
+        self._write("raster", id=self._next_id, **fields)
+        self._next_id += 1
+
+    def begin(self, raster):
+        """The rules are applied on the raster from now on. It's recorded as
+        a puzzle if it's not known yet."""
+        if raster not in self._ids:
+            cells = [
+                [row_idx, col_idx, chr(cell)]
+                for row_idx in range(raster.height)
+                for col_idx, cell in enumerate(raster.get_row(row_idx))
+                if cell != UNKNOWN
+            ]
+            self._register(
+                raster,
+                parent=None,
+                width=raster.width,
+                height=raster.height,
+                rows=[_blocks(meta) for meta in raster.row_meta],
+                cols=[_blocks(meta) for meta in raster.col_meta],
+                cells=cells,
+            )
+        self._current = self._ids[raster]
+
+    def guess(self, parent, raster):
+        """Record the raster guessed from the parent."""
+        cells = []
+        for row_idx in range(raster.height):
+            orig, row = parent.get_row(row_idx), raster.get_row(row_idx)
+            if orig != row:
+                cells.extend(
+                    [row_idx, col_idx, chr(cell)]
+                    for col_idx, cell in enumerate(row)
+                    if cell != orig[col_idx]
+                )
+        self._register(raster, parent=self._ids.get(parent), cells=cells)
+
+    def discrepancy(self, raster, message):
+        """Record the discrepancy detected in the raster."""
+        self._write("discrepancy", raster=self._ids.get(raster), message=message)
+
+    @contextlib.contextmanager
+    def measure(self, func, mask, meta):
+        """Context manager recording the changes of the mask and the meta data
+        made by the rule within its block."""
+        orig_mask, orig_ranges = bytes(mask), meta.ranges()
+        try:
+            yield
+        finally:
+            ranges = meta.ranges()
+            if mask != orig_mask or ranges != orig_ranges:
+                self._write(
+                    "rule",
+                    raster=self._current,
+                    rule=rule_name(func),
+                    row=meta.is_row,
+                    idx=meta.idx,
+                    cells=[
+                        [i, chr(mask[i])]
+                        for i in range(meta.size)
+                        if mask[i] != orig_mask[i]
+                    ],
+                    ranges=[
+                        [j, start, end]
+                        for j, (start, end) in enumerate(ranges)
+                        if (start, end) != orig_ranges[j]
+                    ],
+                )
+
+
+def _puzzle(record):
+    """Return the raster described by the "raster" event of a puzzle."""
+
+    def lines(cls, size, blocks_of_lines):
+        return [
+            cls(size, idx, [Block(*blk) for blk in blocks])
+            for idx, blocks in enumerate(blocks_of_lines)
+        ]
+
+    width, height = record["width"], record["height"]
+    return Raster(
+        table=[bytearray([UNKNOWN]) * width for _ in range(height)],
+        row_meta=lines(Row, width, record["rows"]),
+        col_meta=lines(Column, height, record["cols"]),
+    )
+
+
+def replay(file_, step=None):
+    """Rebuild the state of the rasters from the trace up to (and including)
+    the given step (or to the end). Returns the last event replayed and the
+    raster it refers to."""
+    rasters = {}
+    last, raster = None, None
+    for line_ in file_:
+        record = json.loads(line_)
+        if step is not None and record["step"] > step:
+            break
+        last = record
+
+        if record["event"] == "raster":
+            if record["parent"] is None:
+                raster = _puzzle(record)
+            else:
+                raster = copy.deepcopy(rasters[record["parent"]])
+            for row_idx, col_idx, color in record["cells"]:
+                raster.set_cell(row_idx, col_idx, ord(color))
+            rasters[record["id"]] = raster
+            continue
+
+        raster = rasters.get(record["raster"])
+        if record["event"] == "rule":
+            meta = (raster.col_meta, raster.row_meta)[record["row"]][record["idx"]]
+            for cell_idx, color in record["cells"]:
+                if meta.is_row:
+                    raster.set_cell(meta.idx, cell_idx, ord(color))
+                else:
+                    raster.set_cell(cell_idx, meta.idx, ord(color))
+            for block_idx, start, end in record["ranges"]:
+                meta.blocks[block_idx].start = start
+                meta.blocks[block_idx].end = end
+
+    return last, raster
@@ -0,0 +1,52 @@
+"""
+Undo trail of the changes made on a raster during the search.
+"""
+
+from nonogrampy.raster import UNKNOWN
+
+
+class Trail:
+    """
+    Records the cells colored and the versions of the meta data replaced on
+    the lines of a raster, so that the raster can be rolled back to an
+    earlier state (see mark and undo) instead of being copied.
+    """
+
+    def __init__(self):
+        # (meta, its previous version or None, indices of the colored cells)
+        self._entries = []
+
+    def __len__(self):
+        return len(self._entries)
+
+    def record(self, meta, previous=None, cells=()):
+        """Record that the cells of the line have been colored and its meta
+        data has replaced the previous version (see Raster.set_line)."""
+        if previous is not None or cells:
+            self._entries.append((meta, previous, cells))
+
+    def colored_since(self, mark):
+        """Return the (row index, column index) pairs of the cells colored
+        since the state returned by mark."""
+        return [
+            (meta.idx, cell_idx) if meta.is_row else (cell_idx, meta.idx)
+            for meta, _, cells in self._entries[mark:]
+            for cell_idx in cells
+        ]
+
+    def mark(self):
+        """Return the current state to roll back to later."""
+        return len(self._entries)
+
+    def undo(self, raster, mark):
+        """Roll back the raster to the state returned by mark."""
+        entries = self._entries
+        while len(entries) > mark:
+            meta, previous, cells = entries.pop()
+            for cell_idx in cells:
+                if meta.is_row:
+                    raster.set_cell(meta.idx, cell_idx, UNKNOWN)
+                else:
+                    raster.set_cell(cell_idx, meta.idx, UNKNOWN)
+            if previous is not None:
+                raster.set_line(previous)